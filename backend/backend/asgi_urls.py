@@ -0,0 +1,5 @@
+from recipes.urls import async_urlpatterns
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = async_urlpatterns + sync_urlpatterns
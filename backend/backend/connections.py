@@ -0,0 +1,93 @@
+import os
+import time
+from collections import Counter
+from threading import Lock
+
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+stats = Counter()
+stats_lock = Lock()
+pools = {}
+
+
+def record(name, value=1):
+    with stats_lock:
+        stats[name] += value
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    connection.health_checked_at = time.monotonic()
+    record('opened')
+
+
+def check_connections():
+    interval = getattr(settings, 'DB_HEALTH_CHECK_INTERVAL', 30)
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        if now - getattr(connection, 'health_checked_at', now) < interval:
+            continue
+        connection.health_checked_at = now
+        record('health_checks')
+        if not connection.is_usable():
+            record('health_check_failures')
+            connection.close()
+
+
+def database_sync_to_async(func):
+    def run(*args, **kwargs):
+        close_old_connections()
+        check_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+class ConnectionHealthMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.get_response(request)
+        check_connections()
+        return self.get_response(request)
+
+
+def metrics():
+    with stats_lock:
+        current = dict(stats)
+    return {
+        'pid': os.getpid(),
+        'mode': getattr(settings, 'DB_CONNECTION_MODE', None),
+        'connections': current,
+        'pools': {
+            alias: pool.metrics()
+            for (alias, pid), pool in list(pools.items())
+            if pid == os.getpid()
+        },
+    }
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def connection_metrics(request):
+    return Response(metrics())
@@ -0,0 +1,149 @@
+import os
+import time
+from collections import Counter, deque
+from threading import BoundedSemaphore, Lock
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions, extras
+
+from ..connections import pools
+
+Database = base.Database
+
+POOL_EXHAUSTED = 'Нет свободных соединений в пуле за {} с'
+
+
+class ConnectionPool:
+
+    def __init__(self, conn_params, max_size=10, timeout=5,
+                 health_check_interval=30):
+        self.conn_params = conn_params
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.idle = deque()
+        self.slots = BoundedSemaphore(max_size)
+        self.lock = Lock()
+        self.stats = Counter()
+
+    def record(self, name, value=1):
+        with self.lock:
+            self.stats[name] += value
+
+    def acquire(self):
+        if not self.slots.acquire(blocking=False):
+            self.record('waits')
+            start = time.perf_counter()
+            acquired = self.slots.acquire(timeout=self.timeout)
+            self.record('wait_ms', (time.perf_counter() - start) * 1000)
+            if not acquired:
+                self.record('timeouts')
+                raise Database.OperationalError(
+                    POOL_EXHAUSTED.format(self.timeout)
+                )
+        try:
+            connection = self.take_idle()
+            if connection is None:
+                connection = Database.connect(**self.conn_params)
+                self.record('created')
+        except Exception:
+            self.slots.release()
+            raise
+        self.record('in_use')
+        return connection
+
+    def take_idle(self):
+        while True:
+            with self.lock:
+                if not self.idle:
+                    return None
+                connection, released_at = self.idle.pop()
+            stale = (
+                time.monotonic() - released_at > self.health_check_interval
+            )
+            if connection.closed or (stale and not self.is_usable(connection)):
+                self.discard(connection)
+                continue
+            self.record('reused')
+            return connection
+
+    def is_usable(self, connection):
+        self.record('health_checks')
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Database.Error:
+            self.record('health_check_failures')
+            return False
+        return True
+
+    def discard(self, connection):
+        self.record('discarded')
+        if not connection.closed:
+            connection.close()
+
+    def release(self, connection):
+        try:
+            status = connection.get_transaction_status()
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                self.discard(connection)
+                return
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            with self.lock:
+                self.idle.append((connection, time.monotonic()))
+        except Database.Error:
+            self.discard(connection)
+        finally:
+            self.record('in_use', -1)
+            self.slots.release()
+
+    def metrics(self):
+        with self.lock:
+            current = dict(self.stats)
+            current['idle'] = len(self.idle)
+        current['wait_ms'] = round(current.get('wait_ms', 0), 2)
+        current['max_size'] = self.max_size
+        return current
+
+
+def get_pool(alias, settings_dict, conn_params):
+    key = (alias, os.getpid())
+    pool = pools.get(key)
+    if pool is None:
+        options = settings_dict.get('POOL', {})
+        pool = pools.setdefault(key, ConnectionPool(
+            conn_params,
+            max_size=options.get('MAX_SIZE', 10),
+            timeout=options.get('TIMEOUT', 5),
+            health_check_interval=options.get('HEALTH_CHECK_INTERVAL', 30),
+        ))
+    return pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool(self):
+        return get_pool(
+            self.alias, self.settings_dict, self.get_connection_params()
+        )
+
+    def get_new_connection(self, conn_params):
+        connection = self.get_pool().acquire()
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.get_pool().release(self.connection)
@@ -0,0 +1,154 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger('querybudget')
+
+IN_LIST = re.compile(r'IN \((%s, )*%s\)')
+LITERALS = re.compile(r"'[^']*'|\b\d+\b")
+SPACES = re.compile(r'\s+')
+
+current_recorders = ContextVar('current_recorders', default=())
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def fingerprint(sql):
+    sql = IN_LIST.sub('IN (...)', sql)
+    sql = LITERALS.sub('?', sql)
+    return SPACES.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold=None):
+        threshold = threshold or getattr(
+            settings, 'QUERY_DUPLICATE_THRESHOLD', 3
+        )
+        return {
+            sql: count for sql, count in self.fingerprints.items()
+            if count >= threshold
+        }
+
+
+def record_current(execute, sql, params, many, context):
+    for recorder in current_recorders.get():
+        execute = partial(recorder, execute)
+    return execute(sql, params, many, context)
+
+
+def install_recorder(connection):
+    if record_current not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_current)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    install_recorder(connection)
+
+
+@contextmanager
+def record_queries():
+    recorder = QueryRecorder()
+    for connection in connections.all():
+        install_recorder(connection)
+    token = current_recorders.set(current_recorders.get() + (recorder,))
+    try:
+        yield recorder
+    finally:
+        current_recorders.reset(token)
+
+
+@contextmanager
+def assert_max_queries(budget):
+    with record_queries() as recorder:
+        yield recorder
+    if recorder.count > budget:
+        raise QueryBudgetExceeded(
+            f'{recorder.count} запросов при бюджете {budget}: '
+            f'{recorder.duplicates()}'
+        )
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        with record_queries() as recorder:
+            response = await self.get_response(request)
+        return self.report(request, response, recorder)
+
+    def report(self, request, response, recorder):
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        budgets = getattr(settings, 'QUERY_BUDGETS', {})
+        budget = budgets.get(
+            f'{request.method} {view_name}', budgets.get(view_name)
+        )
+        duplicates = recorder.duplicates()
+        duration = recorder.duration * 1000
+        response['Server-Timing'] = (
+            f'db;dur={duration:.1f};desc="{recorder.count} queries"'
+        )
+        report = {
+            'view': view_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(duration, 2),
+            'budget': budget,
+            'duplicates': duplicates,
+        }
+        over_budget = budget is not None and recorder.count > budget
+        logger.log(
+            logging.WARNING if over_budget or duplicates else logging.INFO,
+            json.dumps(report, ensure_ascii=False)
+        )
+        if over_budget and getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(
+                f'{view_name}: {recorder.count} запросов '
+                f'при бюджете {budget}'
+            )
+        return response
@@ -0,0 +1,188 @@
+import hashlib
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.db import connections
+from rest_framework.authtoken.models import Token
+from rest_framework.permissions import SAFE_METHODS
+
+from .connections import record
+
+PRIMARY = 'default'
+PRIMARY_MODELS = (Session, Token)
+
+current_request = ContextVar('current_request', default=None)
+lags = {}
+lags_lock = Lock()
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != PRIMARY]
+
+
+def postgresql_lag(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT CASE WHEN pg_last_wal_receive_lsn() '
+            '= pg_last_wal_replay_lsn() THEN 0 ELSE EXTRACT(EPOCH FROM '
+            'now() - pg_last_xact_replay_timestamp()) END'
+        )
+        return cursor.fetchone()[0] or 0
+
+
+def sqlite_lag(connection):
+    primary = os.path.getmtime(connections[PRIMARY].settings_dict['NAME'])
+    replica = os.path.getmtime(connection.settings_dict['NAME'])
+    return max(primary - replica, 0)
+
+
+LAG_CHECKS = {
+    'postgresql': postgresql_lag,
+    'sqlite': sqlite_lag,
+}
+
+
+def replica_lag(alias):
+    interval = getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 5)
+    now = time.monotonic()
+    with lags_lock:
+        checked_at, lag = lags.get(alias, (None, None))
+    if checked_at is not None and now - checked_at < interval:
+        return lag
+    connection = connections[alias]
+    check = LAG_CHECKS.get(connection.vendor)
+    try:
+        lag = check(connection) if check else 0
+    except Exception:
+        lag = float('inf')
+    with lags_lock:
+        lags[alias] = (now, lag)
+    return lag
+
+
+def choose_replica():
+    max_lag = getattr(settings, 'REPLICA_MAX_LAG', 2)
+    aliases = replica_aliases()
+    random.shuffle(aliases)
+    for alias in aliases:
+        if replica_lag(alias) <= max_lag:
+            return alias
+    if aliases:
+        record('replica_fallbacks')
+    return PRIMARY
+
+
+def client_credentials(request):
+    credentials = request.META.get('HTTP_AUTHORIZATION')
+    if credentials:
+        return credentials
+    session = getattr(request, 'session', None)
+    session_key = (
+        session.session_key if session is not None
+        else request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    return f'session:{session_key}' if session_key else None
+
+
+def pin_key(request):
+    credentials = client_credentials(request)
+    if not credentials:
+        return None
+    digest = hashlib.md5(credentials.encode()).hexdigest()
+    return f'replica-pin:{digest}'
+
+
+def pin_cache():
+    return caches[getattr(settings, 'REPLICA_PIN_CACHE_ALIAS', 'default')]
+
+
+def is_pinned(request):
+    key = pin_key(request)
+    return key is not None and pin_cache().get(key) is not None
+
+
+def pin(request):
+    key = pin_key(request)
+    if key is not None:
+        pin_cache().set(
+            key, True, getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+        )
+
+
+def read_alias():
+    request = current_request.get()
+    if request is None or request.method not in SAFE_METHODS:
+        return PRIMARY
+    if not hasattr(request, 'replica_alias'):
+        request.replica_alias = (
+            PRIMARY if is_pinned(request) else choose_replica()
+        )
+    return request.replica_alias
+
+
+@contextmanager
+def primary_reads():
+    token = current_request.set(None)
+    try:
+        yield
+    finally:
+        current_request.reset(token)
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = current_request.set(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        if request.method not in SAFE_METHODS:
+            pin(request)
+        return response
+
+    async def __acall__(self, request):
+        token = current_request.set(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        if request.method not in SAFE_METHODS:
+            await sync_to_async(pin)(request)
+        return response
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if model in PRIMARY_MODELS or len(settings.DATABASES) == 1:
+            return PRIMARY
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == PRIMARY
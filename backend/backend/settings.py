@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -32,6 +33,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.connections.ConnectionHealthMiddleware',
+    'backend.routers.ReplicaMiddleware',
+    'backend.querybudget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -41,7 +45,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'backend.urls'
+ROOT_URLCONF = os.getenv('ROOT_URLCONF', default='backend.urls')
 
 TEMPLATES = [
     {
@@ -62,6 +66,11 @@ TEMPLATES = [
 WSGI_APPLICATION = 'backend.wsgi.application'
 
 
+DB_CONNECTION_MODE = os.getenv('DB_CONNECTION_MODE', default='persistent')
+DB_HEALTH_CHECK_INTERVAL = int(
+    os.getenv('DB_HEALTH_CHECK_INTERVAL', default=30)
+)
+
 DATABASES = {
     'default': {
         'ENGINE': os.getenv('DB_ENGINE'),
@@ -70,7 +79,128 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        'DISABLE_SERVER_SIDE_CURSORS': DB_CONNECTION_MODE == 'pgbouncer',
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_SIZE', default=4)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=5)),
+            'HEALTH_CHECK_INTERVAL': DB_HEALTH_CHECK_INTERVAL,
+        },
+        'TEST': {
+            'NAME': os.getenv('DB_TEST_NAME'),
+        },
+    }
+}
+if DB_CONNECTION_MODE in ('request', 'pool'):
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+if DB_CONNECTION_MODE == 'pool' and DATABASES['default']['ENGINE'] in (
+        'django.db.backends.postgresql',
+        'django.db.backends.postgresql_psycopg2'):
+    DATABASES['default']['ENGINE'] = 'backend.postgresql_pool'
+
+REPLICA_ADDRESS_KEY = (
+    'NAME' if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3'
+    else 'HOST'
+)
+for number, address in enumerate(
+        filter(None, os.getenv('DB_REPLICAS', default='').split(',')), 1):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        REPLICA_ADDRESS_KEY: address.strip(),
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['backend.routers.ReplicaRouter']
+REPLICA_MAX_LAG = 2
+REPLICA_LAG_CHECK_INTERVAL = 5
+REPLICA_PIN_SECONDS = 5
+REPLICA_PIN_CACHE_ALIAS = 'default'
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            default=os.path.join(tempfile.gettempdir(), 'foodgram_cache')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', default=10000)),
+        },
+    },
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'foodgram',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+CATALOG_CACHE_ALIAS = 'default'
+CATALOG_SHARED_CACHE = True
+CATALOG_CACHE_TIMEOUT = 60 * 60
+CATALOG_LOCAL_CACHE_SIZE = 256
+
+RECIPE_FRAGMENT_CACHE_ALIAS = 'local'
+RECIPE_FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+RECIPE_IMAGE_MAX_SIZE = int(
+    os.getenv('RECIPE_IMAGE_MAX_SIZE', default=5 * 1024 * 1024)
+)
+
+IMAGE_PIPELINE_MODE = os.getenv('IMAGE_PIPELINE_MODE', default='thread')
+IMAGE_PIPELINE_WORKERS = int(os.getenv('IMAGE_PIPELINE_WORKERS', default=2))
+IMAGE_RENDITIONS = {
+    'thumbnail': (320, 320),
+    'card': (640, 640),
+}
+IMAGE_RENDITION_QUALITY = 80
+
+INGREDIENT_AUTOCOMPLETE_BACKEND = os.getenv(
+    'INGREDIENT_AUTOCOMPLETE_BACKEND', default='memory'
+)
+INGREDIENT_AUTOCOMPLETE_LIMIT = 50
+
+RECIPE_SEARCH_CONFIG = 'russian'
+
+TIMELINE_SIZE = 500
+TIMELINE_TRIM_SLACK = 100
+TIMELINE_FANOUT_LIMIT = 10000
+TIMELINE_BATCH_SIZE = 1000
+
+QUERY_BUDGETS = {
+    'GET recipes-list': 10,
+    'GET recipes-detail': 8,
+    'POST recipes-list': 24,
+    'PATCH recipes-detail': 32,
+    'GET recipes-cook': 8,
+    'GET recipes-feed': 11,
+    'GET users-list': 4,
+    'GET users-detail': 3,
+    'GET users-subscriptions': 4,
+    'GET tags-list': 2,
+    'GET indegrients-list': 2,
+}
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', default='') == 'True'
+QUERY_DUPLICATE_THRESHOLD = 3
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'querybudget': {
+            'handlers': ['console'],
+            'level': os.getenv('QUERY_LOG_LEVEL', default='WARNING'),
+        },
+    },
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -93,6 +223,8 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = 'users.User'
 
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -126,3 +258,4 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+FILE_UPLOAD_PERMISSIONS = 0o644
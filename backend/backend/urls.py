@@ -1,8 +1,11 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from .connections import connection_metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/metrics/connections/', connection_metrics),
     path('', include('users.urls')),
     path('', include('recipes.urls')),
 ]
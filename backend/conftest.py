@@ -0,0 +1,99 @@
+import base64
+import io
+
+import pytest
+from django.core.cache import caches
+from PIL import Image
+from recipes.cache import local_cache
+from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    local_cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        username='cook', email='cook@example.com', password='password',
+        first_name='Иван', last_name='Петров'
+    )
+
+
+@pytest.fixture
+def author(db):
+    return User.objects.create_user(
+        username='author', email='author@example.com', password='password',
+        first_name='Анна', last_name='Смирнова'
+    )
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    token, _ = Token.objects.get_or_create(user=user)
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
+
+
+@pytest.fixture
+def tags(db):
+    return [
+        Tag.objects.create(name=name, slug=slug, color=color)
+        for name, slug, color in (
+            ('Завтрак', 'breakfast', '#E26C2D'),
+            ('Обед', 'lunch', '#49B64E'),
+        )
+    ]
+
+
+@pytest.fixture
+def ingredients(db):
+    Ingredient.objects.bulk_create([
+        Ingredient(name=f'ингредиент {number:02}', measurement_unit='г')
+        for number in range(30)
+    ])
+    return list(Ingredient.objects.order_by('name'))
+
+
+@pytest.fixture
+def make_recipes(author, tags, ingredients):
+    def make(count, ingredient_count=3):
+        Recipe.objects.bulk_create([
+            Recipe(
+                author=author, name=f'Рецепт {number}', text='Описание',
+                cooking_time=10, image='recipe_image/test.png'
+            )
+            for number in range(count)
+        ])
+        recipes = list(Recipe.objects.order_by('id'))[-count:]
+        IngredientInRecipe.objects.bulk_create([
+            IngredientInRecipe(recipe=recipe, ingredient=ingredient, amount=5)
+            for recipe in recipes
+            for ingredient in ingredients[:ingredient_count]
+        ])
+        for recipe in recipes:
+            recipe.tags.set(tags)
+        return recipes
+    return make
+
+
+@pytest.fixture
+def image(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), 'red').save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
@@ -0,0 +1,7 @@
+import os
+
+wsgi_app = os.getenv('GUNICORN_APP', default='backend.wsgi:application')
+bind = os.getenv('GUNICORN_BIND', default='0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', default=1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', default='gthread')
+threads = int(os.getenv('GUNICORN_THREADS', default=4))
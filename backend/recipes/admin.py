@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Favorite, Ingredient, IngredientInRecipe, Recipe, Tag
+from .models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
+                     ShoppingListItem, Tag)
 
 
 class FavoriteAdmin(admin.ModelAdmin):
@@ -15,10 +16,25 @@ class IngredientAdmin(admin.ModelAdmin):
 class IngredientInRecipeAdmin(admin.ModelAdmin):
     list_display = ('id', 'ingredient', 'recipe', 'amount')
 
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        Recipe.objects.filter(pk=obj.recipe_id).touch()
+
+    def delete_queryset(self, request, queryset):
+        recipe_ids = list(queryset.values_list('recipe_id', flat=True))
+        super().delete_queryset(request, queryset)
+        Recipe.objects.filter(pk__in=recipe_ids).touch()
+
 
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('id', 'author', 'name',)
+    list_display = ('id', 'author', 'name', 'favorites_count')
     list_filter = ('author', 'name', 'tags')
+    readonly_fields = ('favorites_count', 'purchases_count')
+
+
+class ShoppingListItemAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'ingredient', 'total')
+    list_filter = ('user',)
 
 
 class TagAdmin(admin.ModelAdmin):
@@ -29,4 +45,5 @@ admin.site.register(Favorite, FavoriteAdmin)
 admin.site.register(Ingredient, IngredientAdmin)
 admin.site.register(IngredientInRecipe, IngredientInRecipeAdmin)
 admin.site.register(Recipe, RecipeAdmin)
+admin.site.register(ShoppingListItem, ShoppingListItemAdmin)
 admin.site.register(Tag, TagAdmin)
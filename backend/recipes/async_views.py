@@ -0,0 +1,26 @@
+from backend.connections import database_sync_to_async
+
+ASYNC_ROUTES = (
+    'recipes-list',
+    'recipes-detail',
+    'recipes-download-shopping-cart',
+    'tags-list',
+    'indegrients-list',
+)
+
+
+@database_sync_to_async
+def run_view(view, request, *args, **kwargs):
+    response = view(request, *args, **kwargs)
+    if callable(getattr(response, 'render', None)):
+        response.render()
+    if response.streaming:
+        response.streaming_content = list(response.streaming_content)
+    return response
+
+
+def offload(view):
+    async def async_view(request, *args, **kwargs):
+        return await run_view(view, request, *args, **kwargs)
+    async_view.csrf_exempt = True
+    return async_view
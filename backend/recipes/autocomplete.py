@@ -0,0 +1,89 @@
+from bisect import bisect_left
+from threading import Lock
+
+from backend.routers import primary_reads
+from django.conf import settings
+from django.db.models.functions import Lower
+
+from .cache import get_version
+from .models import Ingredient
+
+FIELDS = ('id', 'name', 'measurement_unit')
+
+
+class IngredientIndex:
+
+    def __init__(self, rows):
+        self.entries = sorted(
+            (name.casefold(), id, name, measurement_unit)
+            for id, name, measurement_unit in rows
+        )
+        self.keys = [entry[0] for entry in self.entries]
+
+    def search(self, term, limit):
+        term = term.casefold()
+        found = []
+        position = bisect_left(self.keys, term)
+        while (position < len(self.keys) and len(found) < limit
+               and self.keys[position].startswith(term)):
+            found.append(self.entries[position])
+            position += 1
+        if len(found) < limit:
+            for entry in self.entries:
+                if term in entry[0] and not entry[0].startswith(term):
+                    found.append(entry)
+                    if len(found) == limit:
+                        break
+        return [dict(zip(FIELDS, entry[1:])) for entry in found]
+
+
+class MemoryBackend:
+
+    def __init__(self):
+        self.index = None
+        self.version = None
+        self.lock = Lock()
+
+    def get_index(self):
+        version = get_version('ingredients')
+        if self.version != version:
+            with self.lock:
+                if self.version != version:
+                    with primary_reads():
+                        self.index = IngredientIndex(
+                            Ingredient.objects.values_list(*FIELDS).iterator()
+                        )
+                    self.version = version
+        return self.index
+
+    def search(self, term, limit):
+        return self.get_index().search(term, limit)
+
+
+class DatabaseBackend:
+
+    def search(self, term, limit):
+        term = term.lower()
+        queryset = Ingredient.objects.annotate(lower_name=Lower('name'))
+        found = list(queryset.filter(
+            lower_name__startswith=term
+        ).order_by('lower_name').values(*FIELDS)[:limit])
+        if len(found) < limit:
+            found += queryset.filter(lower_name__contains=term).exclude(
+                lower_name__startswith=term
+            ).order_by('lower_name').values(*FIELDS)[:limit - len(found)]
+        return found
+
+
+BACKENDS = {
+    'memory': MemoryBackend(),
+    'database': DatabaseBackend(),
+}
+
+
+def search_ingredients(term, limit=None, backend=None):
+    backend = backend or getattr(
+        settings, 'INGREDIENT_AUTOCOMPLETE_BACKEND', 'memory'
+    )
+    limit = limit or getattr(settings, 'INGREDIENT_AUTOCOMPLETE_LIMIT', 50)
+    return BACKENDS[backend].search(term, limit)
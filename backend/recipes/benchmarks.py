@@ -0,0 +1,791 @@
+import asyncio
+import json
+import math
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from io import StringIO
+from urllib.parse import quote
+from urllib.request import urlopen
+
+from backend.connections import stats as connection_stats
+from backend.querybudget import record_queries
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Count, Max, Q
+from django.http import QueryDict
+from django.test import Client, RequestFactory, override_settings
+from rest_framework.authtoken.models import Token
+from users.models import Follow, User
+from users.pagination import KeysetPagination
+
+from .autocomplete import search_ingredients
+from .filters import RecipeFilter
+from .fragments import reset_stats, stats
+from .matcher import RecipeIndex
+from .models import (Favorite, Ingredient, IngredientInRecipe, Purchase,
+                     Recipe, Tag)
+from .search import reindex_recipes, search_recipes
+from .timelines import read_timeline
+
+INGREDIENTS_PATH = os.path.join(
+    settings.BASE_DIR, 'recipes', 'data', 'ingredients.json'
+)
+
+DISHES = (
+    'борщ', 'суп', 'салат', 'пирог', 'омлет', 'рагу', 'каша', 'пюре',
+    'котлеты', 'блины', 'запеканка', 'плов', 'солянка', 'окрошка',
+)
+FOLLOWS_PER_USER = 10
+FAVORITES_PER_USER = 20
+PURCHASES_PER_USER = 5
+WORDS = (
+    'картофель', 'морковь', 'лук', 'свёкла', 'капуста', 'говядина',
+    'курица', 'рис', 'гречка', 'сметана', 'яйцо', 'мука', 'молоко',
+    'томат', 'чеснок', 'укроп', 'сыр', 'грибы', 'перец', 'масло',
+)
+READ_CLIENTS = 16
+SLOW_CLIENTS = 32
+SLOW_CLIENT_DELAY = 0.5
+UPLOAD_CHUNKS = 10
+UPLOAD_SIZE = 64 * 1024
+SERVER_WORKERS = 2
+SERVER_THREADS = 4
+SERVER_START_TIMEOUT = 30
+DEPLOYMENTS = {
+    'wsgi': ('backend.wsgi:application', 'gthread'),
+    'asgi': ('backend.asgi:application', 'uvicorn.workers.UvicornWorker'),
+}
+IN_MEMORY_DATABASE = (
+    'Серверам нужна файловая тестовая база: задайте DB_TEST_NAME'
+)
+SERVER_NOT_STARTED = 'Сервер {} не запустился за {} с'
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+    return decorator
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summary(timings):
+    timings = sorted(timings)
+    return {
+        'mean_ms': round(statistics.mean(timings), 4),
+        'p50_ms': round(timings[len(timings) // 2], 4),
+        'p95_ms': round(timings[math.ceil(len(timings) * 0.95) - 1], 4),
+    }
+
+
+def seed_ingredients():
+    if not Ingredient.objects.exists():
+        call_command('loadjson', path=INGREDIENTS_PATH, stdout=StringIO())
+
+
+def seed_recipes(count, author_ids=None):
+    author, _ = User.objects.get_or_create(
+        username='benchmark', email='benchmark@example.com'
+    )
+    author_ids = author_ids or [author.id]
+    existing = Recipe.objects.count()
+    last_id = Recipe.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+    Recipe.objects.bulk_create([
+        Recipe(
+            author_id=author_ids[number % len(author_ids)],
+            name=f'{DISHES[number % len(DISHES)].capitalize()} {number}',
+            text=' '.join(
+                WORDS[(number * step) % len(WORDS)] for step in (1, 3, 7)
+            ),
+            cooking_time=10,
+            image='recipe_image/benchmark.png',
+        )
+        for number in range(existing, count)
+    ], batch_size=500)
+    reindex_recipes(Recipe.objects.filter(pk__gt=last_id).values_list(
+        'pk', flat=True
+    ))
+
+
+@scenario('autocomplete')
+def autocomplete(repeat, **options):
+    seed_ingredients()
+    names = list(Ingredient.objects.values_list('name', flat=True)[::50])
+    terms = [name[:length] for name in names for length in (1, 2, 3)]
+    search_ingredients(terms[0], backend='memory')
+
+    def run(search):
+        return lambda: [search(term) for term in terms]
+
+    return {
+        'istartswith filter': summary(measure(run(lambda term: list(
+            Ingredient.objects.filter(name__istartswith=term).values(
+                'id', 'name', 'measurement_unit'
+            )
+        )), repeat)),
+        'database backend': summary(measure(run(
+            lambda term: search_ingredients(term, backend='database')
+        ), repeat)),
+        'memory backend': summary(measure(run(
+            lambda term: search_ingredients(term, backend='memory')
+        ), repeat)),
+    }
+
+
+@scenario('pagination')
+def pagination(repeat, recipes, **options):
+    seed_recipes(recipes)
+    client = Client()
+    page_size = 6
+    deep_page = min(1000, recipes // page_size)
+    after = Recipe.objects.order_by('-pub_date', '-id').values_list(
+        'pub_date', 'id'
+    )[(deep_page - 1) * page_size - 1]
+    paginator = KeysetPagination()
+    paginator.ordering = ['-pub_date', '-id']
+    cursor = paginator.encode_cursor(Recipe(pub_date=after[0], id=after[1]))
+
+    def get(url):
+        return lambda: client.get(url)
+
+    base = f'/api/recipes/?limit={page_size}'
+    return {
+        'offset page 1': summary(measure(get(base), repeat)),
+        f'offset page {deep_page}': summary(measure(
+            get(f'{base}&page={deep_page}'), repeat
+        )),
+        'keyset page 1': summary(measure(get(f'{base}&cursor='), repeat)),
+        f'keyset page {deep_page}': summary(measure(
+            get(f'{base}&cursor={cursor}'), repeat
+        )),
+    }
+
+
+def seed_recipe_ingredients(per_recipe=8, pool=300):
+    ingredient_ids = list(
+        Ingredient.objects.order_by('id').values_list('id', flat=True)[:pool]
+    )
+    recipe_ids = Recipe.objects.filter(
+        ingredient_amounts__isnull=True
+    ).values_list('id', flat=True)
+    IngredientInRecipe.objects.bulk_create([
+        IngredientInRecipe(
+            recipe_id=recipe_id,
+            ingredient_id=ingredient_ids[
+                (recipe_id * 7 + step * 37) % len(ingredient_ids)
+            ],
+            amount=100,
+        )
+        for recipe_id in recipe_ids.iterator()
+        for step in range(per_recipe)
+    ], batch_size=500)
+
+
+def seed_tags():
+    tags = [
+        Tag.objects.get_or_create(
+            slug=slug, defaults={'name': slug, 'color': '#000000'}
+        )[0]
+        for slug in ('breakfast', 'lunch', 'dinner')
+    ]
+    recipe_ids = list(Recipe.objects.filter(
+        tags__isnull=True
+    ).values_list('id', flat=True))
+    Recipe.tags.through.objects.bulk_create([
+        Recipe.tags.through(recipe_id=recipe_id, tag_id=tag.id)
+        for recipe_id in recipe_ids
+        for position, tag in enumerate(tags)
+        if (recipe_id + position) % 2
+    ], batch_size=500)
+
+
+def seed_recipe_relations(user):
+    seed_tags()
+    recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+    for model, step in ((Favorite, 3), (Purchase, 5)):
+        model.objects.bulk_create([
+            model(user=user, recipe_id=recipe_id)
+            for recipe_id in recipe_ids[::step]
+        ], batch_size=500, ignore_conflicts=True)
+
+
+def seed_users(count):
+    password = make_password('benchmark')
+    existing = User.objects.filter(username__startswith='user').count()
+    User.objects.bulk_create([
+        User(
+            username=f'user{number}',
+            email=f'user{number}@example.com',
+            first_name='Имя',
+            last_name='Фамилия',
+            password=password,
+        )
+        for number in range(existing, count)
+    ], batch_size=500)
+    return list(User.objects.filter(
+        username__startswith='user'
+    ).order_by('id').values_list('id', flat=True))
+
+
+def seed_social(user_ids):
+    recipe_ids = list(Recipe.objects.order_by('id').values_list(
+        'id', flat=True
+    ))
+    Follow.objects.bulk_create([
+        Follow(
+            user_id=user_id,
+            author_id=user_ids[(position + step * 7 + 1) % len(user_ids)],
+        )
+        for position, user_id in enumerate(user_ids)
+        for step in range(min(FOLLOWS_PER_USER, len(user_ids) - 1))
+        if user_ids[(position + step * 7 + 1) % len(user_ids)] != user_id
+    ], batch_size=500, ignore_conflicts=True)
+    for model, per_user in ((Favorite, FAVORITES_PER_USER),
+                            (Purchase, PURCHASES_PER_USER)):
+        model.objects.bulk_create([
+            model(
+                user_id=user_id,
+                recipe_id=recipe_ids[
+                    (position * 31 + step * 97) % len(recipe_ids)
+                ],
+            )
+            for position, user_id in enumerate(user_ids)
+            for step in range(per_user)
+        ], batch_size=500, ignore_conflicts=True)
+
+
+def seed_dataset(users, recipes):
+    seed_ingredients()
+    user_ids = seed_users(users)
+    seed_recipes(recipes, user_ids)
+    seed_recipe_ingredients()
+    seed_tags()
+    seed_social(user_ids)
+    call_command('recount', stdout=StringIO())
+    call_command('rebuild_shopping_lists', stdout=StringIO())
+    call_command('rebuild_timelines', stdout=StringIO())
+    return user_ids
+
+
+@scenario('search')
+def search(repeat, recipes, **options):
+    seed_recipes(recipes)
+    terms = ['борщ', 'картоф', 'салат курица', 'каша молоко', 'ананас']
+    page_size = 6
+
+    def icontains(term):
+        queryset = Recipe.objects.all()
+        for word in term.split():
+            queryset = queryset.filter(
+                Q(name__icontains=word) | Q(text__icontains=word)
+            )
+        return queryset.order_by('-pub_date', '-id')
+
+    def run(search):
+        def page():
+            for term in terms:
+                queryset = search(term)
+                queryset.count()
+                list(queryset[:page_size])
+        return page
+
+    return {
+        'icontains filter': summary(measure(run(icontains), repeat)),
+        'full-text index': summary(measure(run(
+            lambda term: search_recipes(Recipe.objects.all(), term)
+        ), repeat)),
+    }
+
+
+@scenario('cook')
+def cook(repeat, recipes, **options):
+    seed_ingredients()
+    seed_recipes(recipes)
+    seed_recipe_ingredients()
+    pool = list(
+        Ingredient.objects.order_by('id').values_list('id', flat=True)[:300]
+    )
+    pantries = [pool[start::37][:size] for start, size in
+                ((0, 5), (3, 10), (7, 20))]
+    page_size = 6
+
+    def group_by(pantry):
+        queryset = IngredientInRecipe.objects.values('recipe').annotate(
+            matched=Count('id', filter=Q(ingredient__in=pantry)),
+            total=Count('id'),
+        ).filter(matched__gte=2)
+        queryset.count()
+        list(queryset.order_by('-matched', 'total')[:page_size])
+
+    index = RecipeIndex(IngredientInRecipe.objects.values_list(
+        'recipe_id', 'ingredient_id'
+    ).order_by().iterator())
+
+    def run(match):
+        return lambda: [match(pantry) for pantry in pantries]
+
+    return {
+        'orm group by': summary(measure(run(group_by), repeat)),
+        'inverted index': summary(measure(run(
+            lambda pantry: index.match(pantry, 2)[:page_size]
+        ), repeat)),
+        'index build': summary(measure(lambda: RecipeIndex(
+            IngredientInRecipe.objects.values_list(
+                'recipe_id', 'ingredient_id'
+            ).order_by().iterator()
+        ), max(repeat // 5, 1))),
+    }
+
+
+@scenario('filters')
+def recipe_filters(repeat, recipes, **options):
+    seed_recipes(recipes)
+    user = User.objects.get(username='benchmark')
+    seed_recipe_relations(user)
+    request = RequestFactory().get('/api/recipes/')
+    request.user = user
+    cases = (
+        'tags=breakfast&tags=dinner',
+        'tags=lunch&is_favorited=1',
+        'tags=breakfast&tags=lunch&is_favorited=1&is_in_shopping_cart=1',
+        f'author={user.id}&is_in_shopping_cart=1',
+    )
+    page_size = 6
+
+    def joins(query):
+        params = QueryDict(query)
+        queryset = Recipe.objects.all()
+        if 'tags' in params:
+            queryset = queryset.filter(tags__slug__in=params.getlist('tags'))
+        if 'author' in params:
+            queryset = queryset.filter(author=params['author'])
+        if 'is_favorited' in params:
+            queryset = queryset.filter(in_favorites__user=user)
+        if 'is_in_shopping_cart' in params:
+            queryset = queryset.filter(in_purchases__user=user)
+        return queryset.distinct()
+
+    def subqueries(query):
+        return RecipeFilter(
+            QueryDict(query), Recipe.objects.all(), request=request
+        ).qs
+
+    def run(build):
+        def page():
+            for query in cases:
+                queryset = build(query).order_by('-pub_date', '-id')
+                queryset.count()
+                list(queryset[:page_size])
+        return page
+
+    return {
+        'join + distinct': summary(measure(run(joins), repeat)),
+        'exists subqueries': summary(measure(run(subqueries), repeat)),
+    }
+
+
+@scenario('conditional')
+def conditional(repeat, recipes, **options):
+    seed_ingredients()
+    seed_recipes(recipes)
+    seed_recipe_ingredients()
+    user = User.objects.get(username='benchmark')
+    token, _ = Token.objects.get_or_create(user=user)
+    client = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+    recent = list(Recipe.objects.order_by('-pub_date', '-id').values_list(
+        'id', flat=True
+    )[:30])
+    urls = [f'/api/recipes/?page={page}' for page in range(1, 6)]
+    urls += [f'/api/recipes/{recipe_id}/' for recipe_id in recent]
+    pattern = [urls[(number * number) % len(urls)] for number in range(200)]
+    favorite = f'/api/recipes/{recent[0]}/favorite/'
+
+    def replay(use_etags):
+        etags = {}
+        transferred = []
+
+        def run():
+            for position, url in enumerate(pattern):
+                if position % 50 == 49:
+                    if client.post(favorite).status_code != 201:
+                        client.delete(favorite)
+                headers = {}
+                if use_etags and url in etags:
+                    headers['HTTP_IF_NONE_MATCH'] = etags[url]
+                response = client.get(url, **headers)
+                if response.status_code == 200:
+                    etags[url] = response['ETag']
+                transferred.append(len(response.content))
+
+        stats = summary(measure(run, repeat))
+        stats['kib_per_replay'] = round(sum(transferred) / repeat / 1024, 1)
+        return stats
+
+    return {
+        'unconditional': replay(False),
+        'if-none-match': replay(True),
+    }
+
+
+@scenario('fragments')
+def fragments(repeat, recipes, **options):
+    seed_ingredients()
+    seed_recipes(recipes)
+    seed_recipe_ingredients()
+    seed_recipe_relations(User.objects.get(username='benchmark'))
+    client = Client()
+    recent = list(Recipe.objects.order_by('-pub_date', '-id').values_list(
+        'id', flat=True
+    )[:30])
+    urls = [f'/api/recipes/?page={page}' for page in range(1, 6)]
+    urls += [f'/api/recipes/{recipe_id}/' for recipe_id in recent]
+    pattern = [urls[(number * number) % len(urls)] for number in range(200)]
+
+    def replay():
+        reset_stats()
+        result = summary(measure(
+            lambda: [client.get(url) for url in pattern], repeat
+        ))
+        result['hit_ratio'] = stats()['hit_ratio']
+        return result
+
+    caches = dict(settings.CACHES)
+    caches['fragments'] = {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+    }
+    with override_settings(
+            CACHES=caches, RECIPE_FRAGMENT_CACHE_ALIAS='fragments'):
+        uncached = replay()
+    return {
+        'without fragments': uncached,
+        'fragment cache': replay(),
+    }
+
+
+def fetch(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, (url, response.status_code)
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+def profile_requests(requests, repeat):
+    fetch(*requests(0))
+    timings = []
+    queries = []
+    for number in range(repeat):
+        with record_queries() as recorder:
+            start = time.perf_counter()
+            fetch(*requests(number))
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(recorder.count)
+    tracemalloc.start()
+    try:
+        for number in range(min(repeat, 5)):
+            fetch(*requests(number))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    result = summary(timings)
+    result['queries'] = round(statistics.mean(queries), 2)
+    result['peak_kib'] = round(peak / 1024, 1)
+    return result
+
+
+@scenario('feed')
+def feed(repeat, recipes, users, **options):
+    user_ids = seed_dataset(users, recipes)
+    readers = list(User.objects.filter(pk__in=user_ids[:20]))
+    Follow.objects.bulk_create([
+        Follow(user=user, author_id=author_id)
+        for user in readers for author_id in user_ids if author_id != user.pk
+    ], ignore_conflicts=True)
+    call_command('recount', stdout=StringIO())
+    call_command('rebuild_timelines', stdout=StringIO())
+    page_size = 6
+
+    def fanout_on_read():
+        for user in readers:
+            list(Recipe.objects.filter(
+                author__following__user=user
+            ).order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )[:page_size + 1])
+
+    def timelines():
+        for user in readers:
+            read_timeline(user, limit=page_size + 1)
+
+    return {
+        'follow join': summary(measure(fanout_on_read, repeat)),
+        'timelines': summary(measure(timelines, repeat)),
+    }
+
+
+def serve(handler, path):
+    response = handler(
+        RequestFactory().get(path).environ, lambda status, headers: None
+    )
+    try:
+        assert response.status_code == 200, (path, response.status_code)
+        return b''.join(response)
+    finally:
+        response.close()
+
+
+@scenario('connections')
+def connection_modes(repeat, recipes, **options):
+    seed_recipes(recipes)
+    handler = WSGIHandler()
+    path = '/api/recipes/?limit=6'
+    max_age = connection.settings_dict['CONN_MAX_AGE']
+    results = {}
+    try:
+        for name, value in (('per request', 0), ('persistent', None)):
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = value
+            serve(handler, path)
+            opened = connection_stats['opened']
+            results[name] = summary(
+                measure(lambda: serve(handler, path), repeat)
+            )
+            results[name]['connections'] = (
+                connection_stats['opened'] - opened
+            )
+    finally:
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+    return results
+
+
+@scenario('api')
+def api(repeat, recipes, users, **options):
+    user_ids = seed_dataset(users, recipes)
+    anonymous = Client()
+    clients = [
+        Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+        for token in (
+            Token.objects.get_or_create(user_id=user_id)[0]
+            for user_id in user_ids[:10]
+        )
+    ]
+    prefixes = [
+        name[:2] for name in
+        Ingredient.objects.values_list('name', flat=True)[::100]
+    ]
+
+    def pick(items, number):
+        return items[number % len(items)]
+
+    endpoints = {
+        'recipes': lambda number: (
+            anonymous, f'/api/recipes/?page={number % 5 + 1}'
+        ),
+        'recipes (user)': lambda number: (
+            pick(clients, number), f'/api/recipes/?page={number % 5 + 1}'
+        ),
+        'subscriptions': lambda number: (
+            pick(clients, number),
+            '/api/users/subscriptions/?recipes_limit=3'
+        ),
+        'feed': lambda number: (
+            pick(clients, number), '/api/recipes/feed/'
+        ),
+        'shopping cart': lambda number: (
+            pick(clients, number), '/api/recipes/download_shopping_cart/'
+        ),
+        'ingredient search': lambda number: (
+            anonymous, f'/api/ingredients/?name={pick(prefixes, number)}'
+        ),
+    }
+    return {
+        name: profile_requests(requests, repeat)
+        for name, requests in endpoints.items()
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(name, port):
+    app, worker_class = DEPLOYMENTS[name]
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn', app,
+            '--worker-class', worker_class,
+            '--workers', str(SERVER_WORKERS),
+            '--threads', str(SERVER_THREADS),
+            '--bind', f'127.0.0.1:{port}',
+        ],
+        cwd=settings.BASE_DIR,
+        env=dict(
+            os.environ, DB_NAME=connection.settings_dict['NAME'],
+            DB_REPLICAS=''
+        ),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            urlopen(f'http://127.0.0.1:{port}/api/tags/', timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise CommandError(SERVER_NOT_STARTED.format(name, SERVER_START_TIMEOUT))
+
+
+async def send_request(port, method, path, headers=(), body=b''):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    headers = (('Host', 'localhost'), ('Connection', 'close'), *headers)
+    if body:
+        headers += (
+            ('Content-Type', 'application/json'),
+            ('Content-Length', len(body)),
+            ('Expect', '100-continue'),
+        )
+    try:
+        writer.write(f'{method} {path} HTTP/1.1\r\n'.encode() + ''.join(
+            f'{name}: {value}\r\n' for name, value in headers
+        ).encode() + b'\r\n')
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        if status == 100:
+            await reader.readline()
+            chunk_size = math.ceil(len(body) / UPLOAD_CHUNKS)
+            for start in range(0, len(body), chunk_size):
+                writer.write(body[start:start + chunk_size])
+                await writer.drain()
+                await asyncio.sleep(SLOW_CLIENT_DELAY / UPLOAD_CHUNKS)
+            status = int((await reader.readline()).split()[1])
+        await reader.read()
+        return status
+    finally:
+        writer.close()
+
+
+async def load(port, requests, upload, repeat):
+    timings = []
+    counts = Counter()
+    done = asyncio.Event()
+
+    async def reader(number):
+        for step in range(repeat):
+            start = time.perf_counter()
+            try:
+                status = await send_request(
+                    port, 'GET', *requests(number * repeat + step)
+                )
+            except (OSError, IndexError, ValueError):
+                status = None
+            if status == 200:
+                timings.append((time.perf_counter() - start) * 1000)
+            else:
+                counts['errors'] += 1
+
+    async def uploader(number):
+        while not done.is_set():
+            try:
+                await send_request(port, 'POST', *upload(number))
+                counts['uploads'] += 1
+            except (OSError, IndexError, ValueError):
+                counts['errors'] += 1
+
+    uploaders = [
+        asyncio.ensure_future(uploader(number))
+        for number in range(SLOW_CLIENTS)
+    ]
+    start = time.perf_counter()
+    await asyncio.gather(*(reader(number) for number in range(READ_CLIENTS)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*uploaders)
+    result = summary(timings)
+    result['requests_per_s'] = round(len(timings) / elapsed, 1)
+    result['uploads_per_s'] = round(counts['uploads'] / elapsed, 1)
+    result['errors'] = counts['errors']
+    return result
+
+
+@scenario('concurrency')
+def concurrency(repeat, recipes, users, **options):
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        raise CommandError(IN_MEMORY_DATABASE)
+    user_ids = seed_dataset(users, recipes)
+    tokens = [
+        Token.objects.get_or_create(user_id=user_id)[0].key
+        for user_id in user_ids[:10]
+    ]
+    recipe_ids = list(Recipe.objects.values_list('id', flat=True)[:100])
+    prefixes = [
+        name[:2] for name in
+        Ingredient.objects.values_list('name', flat=True)[::100]
+    ]
+
+    def pick(items, number):
+        return items[number % len(items)]
+
+    paths = (
+        lambda number: (f'/api/recipes/?page={number % 5 + 1}', ()),
+        lambda number: (f'/api/recipes/{pick(recipe_ids, number)}/', ()),
+        lambda number: ('/api/tags/', ()),
+        lambda number: (
+            f'/api/ingredients/?name={quote(pick(prefixes, number))}', ()
+        ),
+        lambda number: (
+            '/api/recipes/download_shopping_cart/',
+            (('Authorization', f'Token {pick(tokens, number)}'),)
+        ),
+    )
+
+    def requests(number):
+        return pick(paths, number)(number // len(paths))
+
+    body = json.dumps({
+        'name': 'upload',
+        'image': 'data:image/png;base64,' + 'A' * UPLOAD_SIZE,
+    }).encode()
+
+    def upload(number):
+        return (
+            '/api/recipes/',
+            (('Authorization', f'Token {pick(tokens, number)}'),),
+            body
+        )
+
+    results = {}
+    for name in DEPLOYMENTS:
+        port = free_port()
+        process = start_server(name, port)
+        try:
+            results[name] = asyncio.run(
+                load(port, requests, upload, repeat)
+            )
+        finally:
+            process.terminate()
+            process.wait()
+    return results
@@ -0,0 +1,82 @@
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from backend.routers import primary_reads
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'catalog:{catalog}:version'
+DATA_KEY = 'catalog:{catalog}:{version}:{digest}'
+
+
+class LRUCache:
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key not in self.data:
+                return default
+            self.data.move_to_end(key)
+            return self.data[key]
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+local_cache = LRUCache(getattr(settings, 'CATALOG_LOCAL_CACHE_SIZE', 256))
+
+
+def shared_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def get_version(catalog):
+    key = VERSION_KEY.format(catalog=catalog)
+    version = shared_cache().get(key)
+    if version is None:
+        shared_cache().add(key, time.time(), None)
+        version = shared_cache().get(key)
+    return version
+
+
+def bump_version(catalog):
+    version = time.time()
+    shared_cache().set(VERSION_KEY.format(catalog=catalog), version, None)
+    return version
+
+
+def get_or_set(catalog, version, key, default):
+    digest = hashlib.md5(key.encode()).hexdigest()
+    cache_key = DATA_KEY.format(
+        catalog=catalog, version=version, digest=digest
+    )
+    value = local_cache.get(cache_key)
+    if value is not None:
+        return value
+    use_shared = getattr(settings, 'CATALOG_SHARED_CACHE', True)
+    if use_shared:
+        value = shared_cache().get(cache_key)
+    if value is None:
+        with primary_reads():
+            value = default()
+        if use_shared:
+            shared_cache().set(
+                cache_key, value,
+                getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60 * 60)
+            )
+    local_cache.set(cache_key, value)
+    return value
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, register
+
+PROCESS_LOCAL_CACHES = (DummyCache, LocMemCache)
+
+VERSIONS_DIVERGE = (
+    'версии справочников и персональных данных разойдутся между воркерами '
+    'и командами'
+)
+PINS_LOST = (
+    'после записи другой воркер прочитает устаревшие данные с реплики'
+)
+PROCESS_LOCAL_CACHE = (
+    '{setting}: кэш «{alias}» не общий для процессов, {consequence}'
+)
+SHARED_CACHE_HINT = (
+    'Задайте общий бэкенд в CACHE_BACKEND, например FileBasedCache '
+    'или Memcached'
+)
+
+
+def shared_cache_settings():
+    yield 'CATALOG_CACHE_ALIAS', VERSIONS_DIVERGE
+    if len(settings.DATABASES) > 1:
+        yield 'REPLICA_PIN_CACHE_ALIAS', PINS_LOST
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    errors = []
+    for setting, consequence in shared_cache_settings():
+        alias = getattr(settings, setting, 'default')
+        if isinstance(caches[alias], PROCESS_LOCAL_CACHES):
+            errors.append(Error(
+                PROCESS_LOCAL_CACHE.format(
+                    setting=setting, alias=alias, consequence=consequence
+                ),
+                hint=SHARED_CACHE_HINT,
+                id='recipes.E001',
+            ))
+    return errors
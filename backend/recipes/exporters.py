@@ -0,0 +1,96 @@
+import csv
+import json
+
+from django.db import connection
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+
+from .models import ShoppingListItem
+
+EXPORT_CHUNK_SIZE = 500
+FILENAME = 'shopping_cart'
+
+
+class Echo:
+
+    def write(self, value):
+        return value
+
+
+def keyset_rows(queryset):
+    rows = list(queryset[:EXPORT_CHUNK_SIZE])
+    while rows:
+        yield from rows
+        if len(rows) < EXPORT_CHUNK_SIZE:
+            return
+        name = rows[-1]['ingredient__name']
+        unit = rows[-1]['ingredient__measurement_unit']
+        rows = list(queryset.filter(
+            Q(ingredient__name__gt=name) | Q(
+                ingredient__name=name, ingredient__measurement_unit__gt=unit
+            )
+        )[:EXPORT_CHUNK_SIZE])
+
+
+def shopping_cart_rows(user):
+    queryset = ShoppingListItem.objects.filter(user=user).values(
+        'ingredient__name',
+        'ingredient__measurement_unit',
+        'total'
+    ).order_by(
+        'ingredient__name',
+        'ingredient__measurement_unit'
+    )
+    if connection.settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        return keyset_rows(queryset)
+    return queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def export_txt(rows):
+    for row in rows:
+        yield (
+            f'{row["ingredient__name"]} - {row["total"]} '
+            f'{row["ingredient__measurement_unit"]}\n'
+        )
+
+
+def export_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('name', 'amount', 'measurement_unit'))
+    for row in rows:
+        yield writer.writerow((
+            row['ingredient__name'],
+            row['total'],
+            row['ingredient__measurement_unit'],
+        ))
+
+
+def export_json(rows):
+    separator = ''
+    yield '['
+    for row in rows:
+        yield separator + json.dumps({
+            'name': row['ingredient__name'],
+            'amount': row['total'],
+            'measurement_unit': row['ingredient__measurement_unit'],
+        }, ensure_ascii=False)
+        separator = ','
+    yield ']'
+
+
+EXPORTERS = {
+    'txt': (export_txt, 'text/plain; charset=utf-8'),
+    'csv': (export_csv, 'text/csv; charset=utf-8'),
+    'json': (export_json, 'application/json'),
+}
+
+
+def export_shopping_cart(user, export_format='txt'):
+    exporter, content_type = EXPORTERS[export_format]
+    response = StreamingHttpResponse(
+        exporter(shopping_cart_rows(user)),
+        content_type=content_type
+    )
+    filename = f'{FILENAME}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
@@ -1,17 +1,125 @@
 import base64
+import binascii
+import os
+import tempfile
 import uuid
+import weakref
+from io import BytesIO
 
-from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files.uploadedfile import (InMemoryUploadedFile,
+                                            TemporaryUploadedFile,
+                                            UploadedFile)
 from rest_framework import serializers
 
+BASE64_MARKER = ';base64,'
+DECODE_CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r\x0b\x0c'
+STRIP_WHITESPACE = str.maketrans('', '', WHITESPACE)
+
+SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png', 'image/png'),
+    (b'\xff\xd8\xff', 'jpg', 'image/jpeg'),
+    (b'GIF87a', 'gif', 'image/gif'),
+    (b'GIF89a', 'gif', 'image/gif'),
+    (b'BM', 'bmp', 'image/bmp'),
+)
+
+
+def sniff_image_type(header):
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'webp', 'image/webp'
+    for signature, extension, content_type in SIGNATURES:
+        if header.startswith(signature):
+            return extension, content_type
+    return None
+
+
+def iter_base64(data, start):
+    tail = ''
+    for position in range(start, len(data), DECODE_CHUNK_SIZE):
+        chunk = tail + data[
+            position:position + DECODE_CHUNK_SIZE
+        ].translate(STRIP_WHITESPACE)
+        end = len(chunk) - len(chunk) % 4
+        tail = chunk[end:]
+        if end:
+            yield base64.b64decode(chunk[:end], validate=True)
+    if tail:
+        yield base64.b64decode(tail, validate=True)
+
+
+def remove_temporary_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class DecodedTemporaryFile(TemporaryUploadedFile):
+
+    def __init__(self, name, content_type, size):
+        file = tempfile.NamedTemporaryFile(
+            suffix='.upload' + os.path.splitext(name)[1],
+            dir=settings.FILE_UPLOAD_TEMP_DIR,
+            delete=False
+        )
+        UploadedFile.__init__(self, file, name, content_type, size)
+        weakref.finalize(self, remove_temporary_file, file.name)
+
 
 class Base64ImageField(serializers.ImageField):
+    default_error_messages = {
+        'invalid_base64': 'Некорректная картинка в base64.',
+        'too_large': 'Размер картинки не должен превышать {max_size} байт.',
+        'unknown_type': 'Неподдерживаемый формат картинки.',
+    }
+
+    def __init__(self, *args, **kwargs):
+        self.max_size = kwargs.pop('max_size', None) or getattr(
+            settings, 'RECIPE_IMAGE_MAX_SIZE', 5 * 1024 * 1024
+        )
+        super().__init__(*args, **kwargs)
+
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
-            format, imgstr = data.split(';base64,')
-            ext = format.split('/')[-1]
-            id = uuid.uuid4()
-            data = ContentFile(
-                base64.b64decode(imgstr), name=id.urn[9:] + '.' + ext
-            )
+            data = self.decode(data)
         return super().to_internal_value(data)
+
+    def decode(self, data):
+        start = data.find(BASE64_MARKER)
+        if start == -1:
+            self.fail('invalid_base64')
+        start += len(BASE64_MARKER)
+        encoded = len(data) - start - sum(
+            data.count(char, start) for char in WHITESPACE
+        )
+        size = encoded // 4 * 3
+        if size > self.max_size:
+            self.fail('too_large', max_size=self.max_size)
+        chunks = iter_base64(data, start)
+        try:
+            header = next(chunks, b'')
+        except binascii.Error:
+            self.fail('invalid_base64')
+        image_type = sniff_image_type(header)
+        if image_type is None:
+            self.fail('unknown_type')
+        extension, content_type = image_type
+        name = f'{uuid.uuid4()}.{extension}'
+        if size > settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+            file = DecodedTemporaryFile(name, content_type, size)
+        else:
+            file = InMemoryUploadedFile(
+                BytesIO(), None, name, content_type, size, None
+            )
+        file.write(header)
+        try:
+            for chunk in chunks:
+                file.write(chunk)
+        except binascii.Error:
+            file.close()
+            self.fail('invalid_base64')
+        file.size = file.tell()
+        file.seek(0)
+        return file
@@ -1,21 +1,45 @@
 import django_filters as filters
+from django import forms
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Lower
 from django_filters.widgets import BooleanWidget
 
-from .models import Ingredient, Recipe
+from .models import Favorite, Ingredient, Purchase, Recipe
+from .search import search_recipes
 
 
 class IngredientNameFilter(filters.FilterSet):
-    name = filters.CharFilter(field_name='name', lookup_expr='istartswith')
+    name = filters.CharFilter(method='filter_name')
 
     class Meta:
         model = Ingredient
         fields = ('name', 'measurement_unit')
 
+    def filter_name(self, queryset, name, value):
+        return queryset.annotate(lower_name=Lower('name')).filter(
+            lower_name__startswith=value.lower()
+        )
+
+
+class MultipleValueField(forms.MultipleChoiceField):
+
+    def valid_value(self, value):
+        return True
+
+
+class MultipleValueFilter(filters.MultipleChoiceFilter):
+    field_class = MultipleValueField
+
+
+def filter_exists(queryset, name, subquery):
+    alias = f'{name}_exists'
+    return queryset.annotate(**{
+        alias: Exists(subquery.filter(recipe=OuterRef('pk')))
+    }).filter(**{alias: True})
+
 
 class RecipeFilter(filters.FilterSet):
-    tags = filters.AllValuesMultipleFilter(
-        field_name='tags__slug'
-    )
+    tags = MultipleValueFilter(method='filter_tags')
     is_favorited = filters.BooleanFilter(
         method='get_favorite',
         widget=BooleanWidget
@@ -24,19 +48,35 @@ class RecipeFilter(filters.FilterSet):
         method='get_is_in_shopping_cart',
         widget=BooleanWidget
     )
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Recipe
-        fields = ('is_favorited', 'is_in_shopping_cart', 'author', 'tags')
+        fields = (
+            'is_favorited', 'is_in_shopping_cart', 'author', 'tags', 'search'
+        )
 
-    def get_favorite(self, queryset, name, value):
+    def filter_tags(self, queryset, name, value):
+        return filter_exists(
+            queryset, name,
+            Recipe.tags.through.objects.filter(tag__slug__in=value)
+        )
+
+    def filter_user_relation(self, queryset, name, model, value):
+        if not value:
+            return queryset
         user = self.request.user
-        if value:
-            return Recipe.objects.filter(in_favorites__user=user)
-        return Recipe.objects.all()
+        if not user.is_authenticated:
+            return queryset.none()
+        return filter_exists(queryset, name, model.objects.filter(user=user))
+
+    def get_favorite(self, queryset, name, value):
+        return self.filter_user_relation(queryset, name, Favorite, value)
 
     def get_is_in_shopping_cart(self, queryset, name, value):
-        user = self.request.user
-        if value:
-            return Recipe.objects.filter(in_purchases__user=user)
-        return Recipe.objects.all()
+        return self.filter_user_relation(
+            queryset, name, Purchase, value
+        )
+
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
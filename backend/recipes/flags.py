@@ -0,0 +1,63 @@
+from users.models import Follow
+
+from .cache import bump_version, get_version
+from .models import Favorite, Purchase
+
+CONTEXT_KEY = 'personal_flags'
+VERSION_CATALOG = 'personal:{user_id}'
+
+
+class PersonalFlags:
+    sources = {
+        Favorite: 'recipe_id',
+        Purchase: 'recipe_id',
+        Follow: 'author_id',
+    }
+
+    def __init__(self, user):
+        self.user = user
+        self.loaded = {}
+
+    def ids(self, model):
+        if not self.user.is_authenticated:
+            return frozenset()
+        if model not in self.loaded:
+            self.loaded[model] = frozenset(
+                model.objects.filter(user=self.user).values_list(
+                    self.sources[model], flat=True
+                )
+            )
+        return self.loaded[model]
+
+    def is_favorited(self, recipe):
+        return recipe.pk in self.ids(Favorite)
+
+    def is_in_shopping_cart(self, recipe):
+        return recipe.pk in self.ids(Purchase)
+
+    def is_subscribed(self, author):
+        return author.pk in self.ids(Follow)
+
+    def invalidate(self, model):
+        self.loaded.pop(model, None)
+        bump_version(VERSION_CATALOG.format(user_id=self.user.pk))
+
+    def version(self):
+        if not self.user.is_authenticated:
+            return None
+        return get_version(VERSION_CATALOG.format(user_id=self.user.pk))
+
+
+def get_personal_flags(request):
+    request = getattr(request, '_request', request)
+    flags = getattr(request, CONTEXT_KEY, None)
+    if flags is None or flags.user != request.user:
+        flags = PersonalFlags(request.user)
+        setattr(request, CONTEXT_KEY, flags)
+    return flags
+
+
+def personal_flags(context):
+    if CONTEXT_KEY not in context:
+        context[CONTEXT_KEY] = get_personal_flags(context['request'])
+    return context[CONTEXT_KEY]
@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.core.cache import caches
+from users.models import Follow
+
+from .cache import shared_cache
+
+KEY = 'recipe-fragment:{host}:{recipe_id}:{version}'
+STATS_KEY = 'recipe-fragment:stats:{name}'
+
+
+def fragment_cache():
+    return caches[getattr(settings, 'RECIPE_FRAGMENT_CACHE_ALIAS', 'default')]
+
+
+def fragment_key(recipe, request):
+    return KEY.format(
+        host=request.get_host() if request is not None else '',
+        recipe_id=recipe.pk,
+        version=recipe.updated_at.timestamp(),
+    )
+
+
+def record(hits, misses):
+    cache = shared_cache()
+    for name, value in (('hits', hits), ('misses', misses)):
+        if not value:
+            continue
+        key = STATS_KEY.format(name=name)
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            cache.set(key, value, None)
+
+
+def stats():
+    cache = shared_cache()
+    hits = cache.get(STATS_KEY.format(name='hits'), 0)
+    misses = cache.get(STATS_KEY.format(name='misses'), 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
+
+
+def reset_stats():
+    shared_cache().delete_many([
+        STATS_KEY.format(name=name) for name in ('hits', 'misses')
+    ])
+
+
+def get_fragments(recipes, request, render):
+    keys = {recipe.pk: fragment_key(recipe, request) for recipe in recipes}
+    cache = fragment_cache()
+    cached = cache.get_many(keys.values())
+    fragments = {
+        recipe_id: cached[key] for recipe_id, key in keys.items()
+        if key in cached
+    }
+    missing = [recipe_id for recipe_id in keys if recipe_id not in fragments]
+    if missing:
+        rendered = render(missing)
+        cache.set_many(
+            {keys[recipe_id]: data for recipe_id, data in rendered.items()},
+            getattr(settings, 'RECIPE_FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24)
+        )
+        fragments.update(rendered)
+    record(len(recipes) - len(missing), len(missing))
+    return fragments
+
+
+def personalize(fragment, recipe, flags):
+    data = fragment.copy()
+    data['is_favorited'] = flags.is_favorited(recipe)
+    data['is_in_shopping_cart'] = flags.is_in_shopping_cart(recipe)
+    author = data['author'].copy()
+    author['is_subscribed'] = recipe.author_id in flags.ids(Follow)
+    data['author'] = author
+    return data
@@ -0,0 +1,137 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from threading import Lock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS_DIR = 'renditions'
+TEMPORARY_SUFFIX = '.tmp'
+
+executor = None
+executor_lock = Lock()
+
+
+def get_renditions():
+    return getattr(settings, 'IMAGE_RENDITIONS', {
+        'thumbnail': (320, 320),
+        'card': (640, 640),
+    })
+
+
+def rendition_name(image_name, rendition):
+    directory, filename = os.path.split(image_name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(
+        directory, RENDITIONS_DIR, f'{stem}_{rendition}.webp'
+    )
+
+
+def rendition_urls(recipe, request=None):
+    if not recipe.image:
+        return {}
+    urls = {}
+    for rendition in get_renditions():
+        if recipe.renditions_ready:
+            url = default_storage.url(
+                rendition_name(recipe.image.name, rendition)
+            )
+        else:
+            url = recipe.image.url
+        urls[rendition] = request.build_absolute_uri(url) if request else url
+    return urls
+
+
+def replace_file(name, content):
+    if not default_storage.exists(name):
+        return default_storage.save(name, content)
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        default_storage.delete(name)
+        return default_storage.save(name, content)
+    temporary = default_storage.save(f'{name}{TEMPORARY_SUFFIX}', content)
+    try:
+        os.replace(default_storage.path(temporary), path)
+    except OSError:
+        default_storage.delete(temporary)
+        raise
+    return name
+
+
+def save_image(image, name, image_format, **params):
+    buffer = BytesIO()
+    image.save(buffer, image_format, **params)
+    return replace_file(name, ContentFile(buffer.getvalue()))
+
+
+def process_image(recipe_id, image_name):
+    with default_storage.open(image_name) as file:
+        original = Image.open(file)
+        image_format = original.format
+        original.load()
+    image = ImageOps.exif_transpose(original)
+    stripped = Image.frombytes(image.mode, image.size, image.tobytes())
+    if image.mode == 'P':
+        stripped.putpalette(image.getpalette())
+    params = {'quality': 90} if image_format == 'JPEG' else {}
+    save_image(stripped, image_name, image_format, **params)
+    if stripped.mode not in ('RGB', 'RGBA'):
+        stripped = stripped.convert('RGBA')
+    for rendition, size in get_renditions().items():
+        thumbnail = stripped.copy()
+        thumbnail.thumbnail(size)
+        save_image(
+            thumbnail, rendition_name(image_name, rendition), 'WEBP',
+            quality=getattr(settings, 'IMAGE_RENDITION_QUALITY', 80)
+        )
+    Recipe.objects.filter(pk=recipe_id, image=image_name).update(
+        renditions_ready=True, updated_at=timezone.now()
+    )
+
+
+def run(recipe_id, image_name):
+    try:
+        process_image(recipe_id, image_name)
+    except Exception:
+        logger.exception('Не удалось обработать картинку %s', image_name)
+
+
+def run_in_worker(recipe_id, image_name):
+    try:
+        run(recipe_id, image_name)
+    finally:
+        connection.close()
+
+
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'IMAGE_PIPELINE_WORKERS', 2),
+                thread_name_prefix='image-pipeline'
+            )
+    return executor
+
+
+def submit(recipe_id, image_name):
+    if getattr(settings, 'IMAGE_PIPELINE_MODE', 'thread') == 'sync':
+        run(recipe_id, image_name)
+        return
+    get_executor().submit(run_in_worker, recipe_id, image_name)
+
+
+def schedule(recipe):
+    recipe_id, image_name = recipe.pk, recipe.image.name
+    transaction.on_commit(lambda: submit(recipe_id, image_name))
@@ -0,0 +1,130 @@
+import json
+import subprocess
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+from recipes.benchmarks import SCENARIOS
+
+LOWER_IS_BETTER = (
+    '_ms', 'queries', 'peak_kib', 'kib_per_replay', 'connections'
+)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Замер производительности горячих путей API на тестовой базе'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenario',
+            choices=sorted(SCENARIOS),
+            help='benchmark scenario'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='number of measured runs'
+        )
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=10000,
+            help='number of recipes to seed'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=200,
+            help='number of users to seed'
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='keep the test database between runs'
+        )
+        parser.add_argument(
+            '--save',
+            help='write results to a JSON baseline file'
+        )
+        parser.add_argument(
+            '--compare',
+            help='compare results with a JSON baseline file'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=25.0,
+            help='regression threshold in percent for --compare'
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as file:
+                    baseline = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CommandError(f'Не удалось прочитать базу: {error}')
+        old_config = setup_databases(
+            verbosity=0, interactive=False, keepdb=options['keepdb']
+        )
+        try:
+            results = SCENARIOS[options['scenario']](**options)
+        finally:
+            teardown_databases(
+                old_config, verbosity=0, keepdb=options['keepdb']
+            )
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name:<24}' + '  '.join(
+                    f'{key}={value}' for key, value in stats.items()
+                )
+            )
+        if options['save']:
+            with open(options['save'], 'w') as file:
+                json.dump({
+                    'scenario': options['scenario'],
+                    'revision': git_revision(),
+                    'created': datetime.now().isoformat(timespec='seconds'),
+                    'options': {
+                        key: options[key]
+                        for key in ('repeat', 'recipes', 'users')
+                    },
+                    'results': results,
+                }, file, ensure_ascii=False, indent=2)
+        if baseline is not None:
+            self.compare(baseline, results, options['threshold'])
+
+    def compare(self, baseline, results, threshold):
+        self.stdout.write(
+            f"Сравнение с {baseline.get('revision')} "
+            f"({baseline.get('created')}):"
+        )
+        regressions = 0
+        for name, stats in results.items():
+            previous = baseline['results'].get(name, {})
+            for key, value in stats.items():
+                old = previous.get(key)
+                if not isinstance(old, (int, float)) or not old or (
+                        not isinstance(value, (int, float))):
+                    continue
+                delta = (value - old) / old * 100
+                line = f'{name:<24}{key:<16}{old} -> {value} ({delta:+.1f}%)'
+                if key.endswith(LOWER_IS_BETTER) and delta > threshold:
+                    regressions += 1
+                    self.stdout.write(self.style.ERROR(line))
+                else:
+                    self.stdout.write(line)
+        if regressions:
+            raise CommandError(f'Регрессий: {regressions}')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from recipes.fragments import reset_stats, stats
+
+
+class Command(BaseCommand):
+    help = 'Статистика кэша фрагментов рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='reset counters after printing'
+        )
+
+    def handle(self, *args, **options):
+        current = stats()
+        self.stdout.write(
+            f"Попаданий: {current['hits']}, промахов: {current['misses']}, "
+            f"доля попаданий: {current['hit_ratio']}"
+        )
+        if options['reset']:
+            reset_stats()
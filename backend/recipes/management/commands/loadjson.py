@@ -1,28 +1,148 @@
+import csv
 import json
+import os
+import time
 
-from django.core.management.base import BaseCommand
-from recipes.models import Ingredient
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from recipes.cache import bump_version
+from recipes.models import Ingredient, Tag
+
+READ_CHUNK_SIZE = 64 * 1024
+MISSING_FIELD = 'Строка {row}: нет поля «{field}»'
+
+MODELS = {
+    'ingredients': (Ingredient, ('name', 'measurement_unit')),
+    'tags': (Tag, ('slug',)),
+}
+
+
+def iter_json_array(file):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    eof = False
+    while True:
+        buffer = buffer[position:].lstrip()
+        position = 0
+        if not started and buffer:
+            if buffer[0] != '[':
+                raise CommandError('Ожидался JSON-массив')
+            buffer = buffer[1:].lstrip()
+            started = True
+        if buffer.startswith(','):
+            buffer = buffer[1:].lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            item, position = decoder.raw_decode(buffer)
+        except ValueError:
+            if eof:
+                raise CommandError('Некорректный JSON в конце файла')
+            chunk = file.read(READ_CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+        yield item
+
+
+def iter_json_lines(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+READERS = {
+    'json': iter_json_array,
+    'jsonl': iter_json_lines,
+    'csv': csv.DictReader,
+}
 
 
 class Command(BaseCommand):
+    help = 'Загрузка ингредиентов или тегов из json, jsonl или csv'
 
     def add_arguments(self, parser):
         parser.add_argument(
             "--path",
             type=str,
+            required=True,
             help="file path"
         )
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="file format, by default taken from the file extension"
+        )
+        parser.add_argument(
+            "--model",
+            choices=sorted(MODELS),
+            default='ingredients',
+            help="model to import"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="rows per INSERT"
+        )
 
     def handle(self, *args, **options):
         file_path = options["path"]
+        file_format = options["format"] or os.path.splitext(
+            file_path
+        )[1].lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f'Неизвестный формат файла: {file_format}')
+        model, key_fields = MODELS[options["model"]]
+        fields = [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key
+        ]
+        batch_size = options["batch_size"]
+        seen = set(model.objects.values_list(*key_fields))
+        batch = []
+        read = created = 0
+        start = time.perf_counter()
 
         with open(
             file_path,
-            encoding='utf-8'
-        ) as f:
-            data = json.load(f)
-            for item in data:
-                Ingredient.objects.create(
-                    name=item['name'],
-                    measurement_unit=item['measurement_unit']
-                )
+            encoding='utf-8',
+            newline=''
+        ) as f, transaction.atomic():
+            for item in READERS[file_format](f):
+                read += 1
+                try:
+                    key = tuple(item[field] for field in key_fields)
+                    if key in seen:
+                        continue
+                    values = {field: item[field] for field in fields}
+                except KeyError as error:
+                    raise CommandError(MISSING_FIELD.format(
+                        row=read, field=error.args[0]
+                    ))
+                seen.add(key)
+                batch.append(model(**values))
+                if len(batch) >= batch_size:
+                    created += self.write(model, batch, batch_size, read)
+                    batch = []
+            if batch:
+                created += self.write(model, batch, batch_size, read)
+
+        bump_version(options["model"])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Прочитано {read}, добавлено {created} за {elapsed:.2f} с '
+            f'({read / elapsed if elapsed else read:.0f} строк/с)'
+        ))
+
+    def write(self, model, batch, batch_size, read):
+        batch_size = min(batch_size, max(connection.ops.bulk_batch_size(
+            model._meta.concrete_fields, batch
+        ), 1))
+        model.objects.bulk_create(
+            batch, batch_size=batch_size, ignore_conflicts=True
+        )
+        self.stdout.write(f'Обработано строк: {read}')
+        return len(batch)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from recipes.models import Purchase, ShoppingListItem
+from recipes.shopping_list import refresh_shopping_lists
+
+
+class Command(BaseCommand):
+    help = 'Сверка списков покупок с живой агрегацией корзин'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='users per batch'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = set(Purchase.objects.values_list('user_id', flat=True))
+        user_ids.update(
+            ShoppingListItem.objects.values_list('user_id', flat=True)
+        )
+        user_ids = sorted(user_ids)
+        batch_size = options['batch_size']
+        added = changed = removed = 0
+        for start in range(0, len(user_ids), batch_size):
+            batch = refresh_shopping_lists(user_ids[start:start + batch_size])
+            added += batch[0]
+            changed += batch[1]
+            removed += batch[2]
+        self.stdout.write(self.style.SUCCESS(
+            f'Пользователей: {len(user_ids)}, добавлено {added}, '
+            f'исправлено {changed}, удалено {removed}'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from recipes.models import TimelineEntry
+from recipes.timelines import rebuild_timeline
+from users.models import Follow
+
+
+class Command(BaseCommand):
+    help = 'Пересборка лент подписок'
+
+    def handle(self, *args, **options):
+        user_ids = set(Follow.objects.values_list('user_id', flat=True))
+        user_ids.update(
+            TimelineEntry.objects.values_list('user_id', flat=True)
+        )
+        for user_id in sorted(user_ids):
+            rebuild_timeline(user_id)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пользователей: {len(user_ids)}, записей в лентах: '
+            f'{TimelineEntry.objects.count()}'
+        ))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from recipes.models import Favorite, Purchase, Recipe
+from users.models import Follow, User
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (Recipe, 'purchases_count', Purchase, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+    (User, 'followers_count', Follow, 'author'),
+)
+
+
+def count_subquery(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(count=Count('pk')).values('count'),
+        output_field=IntegerField()
+    ), 0)
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт счётчиков избранного, покупок, рецептов и подписчиков'
+
+    def handle(self, *args, **options):
+        for target, counter, source, field in COUNTERS:
+            with transaction.atomic():
+                drifted = target.objects.annotate(
+                    actual=count_subquery(source, field)
+                ).exclude(**{counter: F('actual')})
+                fixed = target.objects.filter(
+                    pk__in=list(drifted.values_list('pk', flat=True))
+                ).update(
+                    **{counter: count_subquery(source, field)}
+                )
+            self.stdout.write(
+                f'{target._meta.model_name}.{counter}: исправлено {fixed}'
+            )
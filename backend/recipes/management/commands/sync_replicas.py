@@ -0,0 +1,28 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SQLITE_ONLY = 'Копирование реплик поддерживается только для SQLite'
+
+
+class Command(BaseCommand):
+    help = 'Копирование основной SQLite-базы в локальные реплики'
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES['default']
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError(SQLITE_ONLY)
+        source = sqlite3.connect(primary['NAME'])
+        try:
+            for alias, database in settings.DATABASES.items():
+                if alias == 'default':
+                    continue
+                target = sqlite3.connect(database['NAME'])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: {database["NAME"]}')
+        finally:
+            source.close()
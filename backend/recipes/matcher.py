@@ -0,0 +1,172 @@
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter, namedtuple
+from threading import Lock
+
+from backend.routers import primary_reads
+
+from .cache import shared_cache
+from .models import IngredientInRecipe
+
+SEQUENCE_KEY = 'matcher:sequence'
+CHANGE_KEY = 'matcher:change:{}'
+CHANGE_TIMEOUT = 60 * 60
+REPLAY_LIMIT = 500
+
+Match = namedtuple('Match', 'recipe_id matched total missing')
+
+
+class RecipeIndex:
+
+    def __init__(self, rows=()):
+        self.postings = {}
+        self.recipes = {}
+        for recipe_id, ingredient_id in rows:
+            self.recipes.setdefault(recipe_id, array('I')).append(
+                ingredient_id
+            )
+        for recipe_id, ingredient_ids in self.recipes.items():
+            for ingredient_id in ingredient_ids:
+                self.postings.setdefault(ingredient_id, array('I')).append(
+                    recipe_id
+                )
+        for recipe_ids in self.postings.values():
+            recipe_ids[:] = array('I', sorted(recipe_ids))
+
+    def copy(self):
+        index = RecipeIndex()
+        index.postings = dict(self.postings)
+        index.recipes = dict(self.recipes)
+        return index
+
+    def remove(self, recipe_id):
+        for ingredient_id in self.recipes.pop(recipe_id, ()):
+            recipe_ids = array('I', self.postings[ingredient_id])
+            del recipe_ids[bisect_left(recipe_ids, recipe_id)]
+            if recipe_ids:
+                self.postings[ingredient_id] = recipe_ids
+            else:
+                del self.postings[ingredient_id]
+
+    def add(self, recipe_id, ingredient_ids):
+        self.remove(recipe_id)
+        if not ingredient_ids:
+            return
+        self.recipes[recipe_id] = array('I', ingredient_ids)
+        for ingredient_id in ingredient_ids:
+            recipe_ids = array('I', self.postings.get(ingredient_id, ()))
+            insort(recipe_ids, recipe_id)
+            self.postings[ingredient_id] = recipe_ids
+
+    def updated(self, ingredients):
+        index = self.copy()
+        for recipe_id, ingredient_ids in ingredients.items():
+            index.add(recipe_id, ingredient_ids)
+        return index
+
+    def match(self, ingredient_ids, min_matches=1):
+        have = set(ingredient_ids)
+        hits = Counter()
+        for ingredient_id in have:
+            hits.update(self.postings.get(ingredient_id, ()))
+        found = []
+        for recipe_id, matched in hits.items():
+            if matched < min_matches:
+                continue
+            ingredients = self.recipes[recipe_id]
+            found.append(Match(
+                recipe_id, matched, len(ingredients),
+                tuple(id for id in ingredients if id not in have)
+            ))
+        found.sort(key=lambda match: (
+            -match.matched / match.total, len(match.missing),
+            -match.recipe_id
+        ))
+        return found
+
+
+def current_sequence():
+    cache = shared_cache()
+    cache.add(SEQUENCE_KEY, int(time.time() * 1000), None)
+    return cache.get(SEQUENCE_KEY)
+
+
+def publish(recipe_ids):
+    cache = shared_cache()
+    current_sequence()
+    while True:
+        sequence = cache.incr(SEQUENCE_KEY)
+        if cache.add(
+            CHANGE_KEY.format(sequence), list(recipe_ids), CHANGE_TIMEOUT
+        ):
+            return sequence
+
+
+def changed_recipes(start, end):
+    keys = [CHANGE_KEY.format(sequence) for sequence in range(start, end)]
+    changes = shared_cache().get_many(keys)
+    if len(changes) < len(keys):
+        return None
+    return {
+        recipe_id for recipe_ids in changes.values()
+        for recipe_id in recipe_ids
+    }
+
+
+def recipe_ingredients(recipe_ids):
+    ingredients = {recipe_id: [] for recipe_id in recipe_ids}
+    with primary_reads():
+        for recipe_id, ingredient_id in IngredientInRecipe.objects.filter(
+            recipe_id__in=recipe_ids
+        ).values_list('recipe_id', 'ingredient_id'):
+            ingredients[recipe_id].append(ingredient_id)
+    return ingredients
+
+
+class RecipeMatcher:
+
+    def __init__(self):
+        self.index = None
+        self.sequence = None
+        self.lock = Lock()
+
+    def get_index(self):
+        sequence = current_sequence()
+        if self.sequence != sequence:
+            with self.lock:
+                if self.sequence != sequence:
+                    self.index = self.replay(sequence) or self.build()
+                    self.sequence = sequence
+        return self.index
+
+    def build(self):
+        with primary_reads():
+            return RecipeIndex(
+                IngredientInRecipe.objects.values_list(
+                    'recipe_id', 'ingredient_id'
+                ).order_by().iterator()
+            )
+
+    def replay(self, sequence):
+        if self.index is None or not (
+                0 < sequence - self.sequence <= REPLAY_LIMIT):
+            return None
+        recipe_ids = changed_recipes(self.sequence + 1, sequence + 1)
+        if recipe_ids is None:
+            return None
+        return self.index.updated(recipe_ingredients(recipe_ids))
+
+    def update(self, recipe_ids):
+        sequence = publish(recipe_ids)
+        ingredients = recipe_ingredients(set(recipe_ids))
+        with self.lock:
+            if self.index is not None and self.sequence == sequence - 1:
+                self.index = self.index.updated(ingredients)
+                self.sequence = sequence
+
+    def match(self, ingredient_ids, min_matches=1):
+        return self.get_index().match(ingredient_ids, min_matches)
+
+
+matcher = RecipeMatcher()
@@ -0,0 +1,42 @@
+# Generated by Django 2.2.19 on 2026-10-18 04:22
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicates(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    IngredientInRecipe = apps.get_model('recipes', 'IngredientInRecipe')
+    duplicates = Ingredient.objects.order_by().values(
+        'name', 'measurement_unit'
+    ).annotate(first=Min('id'), count=Count('id')).filter(count__gt=1)
+    for group in duplicates:
+        extra = Ingredient.objects.filter(
+            name=group['name'],
+            measurement_unit=group['measurement_unit'],
+        ).exclude(id=group['first'])
+        amounts = IngredientInRecipe.objects.filter(ingredient__in=extra)
+        for amount in amounts:
+            if IngredientInRecipe.objects.filter(
+                recipe_id=amount.recipe_id, ingredient_id=group['first']
+            ).exists():
+                amount.delete()
+            else:
+                amount.ingredient_id = group['first']
+                amount.save(update_fields=['ingredient'])
+        extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_ingredient_lower_name_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('name', 'measurement_unit'), name='unique_ingredient'),
+        ),
+    ]
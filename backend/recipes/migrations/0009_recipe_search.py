@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.db import migrations
+
+INDEX_NAME = 'recipes_recipe_search_idx'
+FTS_TABLE = 'recipes_recipe_fts'
+INGREDIENT_NAMES = (
+    'SELECT {aggregate} FROM recipes_ingredientinrecipe '
+    'JOIN recipes_ingredient '
+    'ON recipes_ingredient.id = recipes_ingredientinrecipe.ingredient_id '
+    'WHERE recipes_ingredientinrecipe.recipe_id = recipes_recipe.id'
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        names = INGREDIENT_NAMES.format(
+            aggregate="string_agg(recipes_ingredient.name, ' ')"
+        )
+        schema_editor.execute(
+            'ALTER TABLE recipes_recipe '
+            'ADD COLUMN IF NOT EXISTS search_vector tsvector'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} '
+            'ON recipes_recipe USING GIN (search_vector)'
+        )
+        schema_editor.execute(
+            'UPDATE recipes_recipe SET search_vector = '
+            "setweight(to_tsvector(%s::regconfig, name), 'A') || "
+            f"setweight(to_tsvector(%s::regconfig, COALESCE(({names}), '')), "
+            "'B') || setweight(to_tsvector(%s::regconfig, text), 'C')",
+            [settings.RECIPE_SEARCH_CONFIG] * 3
+        )
+    elif vendor == 'sqlite':
+        names = INGREDIENT_NAMES.format(
+            aggregate="group_concat(recipes_ingredient.name, ' ')"
+        )
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+            "USING fts5(name, ingredients, text, tokenize='unicode61')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, ingredients, text) '
+            f"SELECT id, name, COALESCE(({names}), ''), text "
+            'FROM recipes_recipe'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+        schema_editor.execute(
+            'ALTER TABLE recipes_recipe DROP COLUMN IF EXISTS search_vector'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_shoppinglistitem'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+INDEXES = (
+    (
+        'recipe_author_pub_date_idx', 'recipes_recipe',
+        'author_id, pub_date DESC, id DESC',
+    ),
+    (
+        'recipes_recipe_tags_tag_recipe_idx', 'recipes_recipe_tags',
+        'tag_id, recipe_id',
+    ),
+)
+
+
+def concurrently(schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        return 'CONCURRENTLY '
+    return ''
+
+
+def create_indexes(apps, schema_editor):
+    for name, table, columns in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX {concurrently(schema_editor)}IF NOT EXISTS '
+            f'{name} ON {table} ({columns})'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    for name, table, columns in INDEXES:
+        schema_editor.execute(
+            f'DROP INDEX {concurrently(schema_editor)}IF EXISTS {name}'
+        )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('recipes', '0012_timelineentry'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='recipe',
+                    index=models.Index(fields=['author', '-pub_date', '-id'], name='recipe_author_pub_date_idx'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,115 @@
+import hashlib
+import json
+
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .cache import get_or_set, get_version
+from .flags import get_personal_flags
+from .fragments import get_fragments, personalize
+
+ETAG_CATALOGS = ('tags', 'ingredients')
+WATERMARK_FIELDS = ('id', 'author', 'pub_date', 'updated_at')
+
+
+class CatalogCacheMixin:
+    catalog = None
+
+    def list(self, request, *args, **kwargs):
+        version = get_version(self.catalog)
+        etag = f'"{self.catalog}-{version}"'
+        last_modified = int(version)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            return response
+        data = get_or_set(
+            self.catalog, version, request.get_full_path(),
+            lambda: self.get_catalog_data(request, *args, **kwargs)
+        )
+        response = Response(data)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get_catalog_data(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs).data
+
+
+class ConditionalRecipeMixin:
+
+    def get_etag(self, request, *parts):
+        flags = get_personal_flags(request)
+        state = [request.user.pk, flags.version()]
+        state += [get_version(catalog) for catalog in ETAG_CATALOGS]
+        state += parts
+        digest = hashlib.md5(
+            json.dumps(state, default=str).encode()
+        ).hexdigest()
+        return f'"{digest}"'
+
+    def get_not_modified(self, request, etag):
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            response['ETag'] = etag
+        return response
+
+    def finalize_etag(self, response, etag):
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def get_watermark_queryset(self):
+        return self.get_queryset().model.objects.only(*WATERMARK_FIELDS)
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(
+            self.filter_queryset(self.get_watermark_queryset())
+        )
+        etag = self.get_etag(
+            request, self.get_paginated_response([]).data,
+            [(recipe.pk, recipe.updated_at) for recipe in page]
+        )
+        response = self.get_not_modified(request, etag)
+        if response is not None:
+            return response
+        return self.finalize_etag(
+            self.get_paginated_response(self.get_recipe_data(request, page)),
+            etag
+        )
+
+    def render_fragments(self, recipe_ids):
+        serializer = self.get_serializer()
+        return {
+            recipe_id: serializer.to_representation(recipe)
+            for recipe_id, recipe in self.get_queryset().in_bulk(
+                recipe_ids
+            ).items()
+        }
+
+    def get_recipe_data(self, request, recipes):
+        fragments = get_fragments(recipes, request, self.render_fragments)
+        flags = get_personal_flags(request)
+        return [
+            personalize(fragments[recipe.pk], recipe, flags)
+            for recipe in recipes if recipe.pk in fragments
+        ]
+
+    def retrieve(self, request, *args, **kwargs):
+        recipe = get_object_or_404(
+            self.get_watermark_queryset(),
+            pk=self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        )
+        self.check_object_permissions(request, recipe)
+        etag = self.get_etag(request, recipe.pk, recipe.updated_at)
+        response = self.get_not_modified(request, etag)
+        if response is not None:
+            return response
+        data = self.get_recipe_data(request, [recipe])
+        if not data:
+            raise Http404
+        return self.finalize_etag(Response(data[0]), etag)
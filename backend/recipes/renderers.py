@@ -0,0 +1,35 @@
+from rest_framework import negotiation, renderers
+
+
+class PlainTextRenderer(renderers.BaseRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = '\n'.join(f'{key}: {value}' for key, value in data.items())
+        return str(data).encode(self.charset)
+
+
+class CSVRenderer(PlainTextRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+SHOPPING_CART_RENDERERS = (
+    PlainTextRenderer,
+    CSVRenderer,
+    renderers.JSONRenderer,
+)
+
+
+class FormatNegotiation(negotiation.DefaultContentNegotiation):
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        export_format = format_suffix or request.query_params.get(
+            self.settings.URL_FORMAT_OVERRIDE
+        )
+        if export_format:
+            renderers = self.filter_renderers(renderers, export_format)
+        return renderers[0], renderers[0].media_type
@@ -0,0 +1,141 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .models import Ingredient, IngredientInRecipe, Recipe
+
+RECIPE = Recipe._meta.db_table
+FTS_TABLE = f'{RECIPE}_fts'
+INGREDIENT_NAMES = (
+    'SELECT {aggregate} FROM {amounts} JOIN {ingredients} '
+    'ON {ingredients}.id = {amounts}.ingredient_id '
+    'WHERE {amounts}.recipe_id = {recipe}.id'
+)
+
+
+def ingredient_names(aggregate):
+    return INGREDIENT_NAMES.format(
+        aggregate=aggregate,
+        amounts=IngredientInRecipe._meta.db_table,
+        ingredients=Ingredient._meta.db_table,
+        recipe=RECIPE,
+    )
+
+
+def tokens(term):
+    return re.findall(r'\w+', term.lower())
+
+
+class PostgresBackend:
+    vector = (
+        "setweight(to_tsvector(%s::regconfig, {recipe}.name), 'A') || "
+        "setweight(to_tsvector(%s::regconfig, "
+        "COALESCE(({names}), '')), 'B') || "
+        "setweight(to_tsvector(%s::regconfig, {recipe}.text), 'C')"
+    )
+
+    def reindex(self, recipe_ids):
+        config = settings.RECIPE_SEARCH_CONFIG
+        vector = self.vector.format(recipe=RECIPE, names=ingredient_names(
+            f"string_agg({Ingredient._meta.db_table}.name, ' ')"
+        ))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {RECIPE} SET search_vector = {vector} '
+                f'WHERE {RECIPE}.id = ANY(%s)',
+                [config, config, config, list(recipe_ids)]
+            )
+
+    def search(self, queryset, words):
+        query = ' & '.join(f'{word}:*' for word in words)
+        params = [settings.RECIPE_SEARCH_CONFIG, query]
+        return queryset.extra(
+            select={'search_rank': f'ts_rank({RECIPE}.search_vector, '
+                                   'to_tsquery(%s::regconfig, %s))'},
+            select_params=params,
+            where=[f'{RECIPE}.search_vector @@ '
+                   'to_tsquery(%s::regconfig, %s)'],
+            params=params,
+        )
+
+
+class SqliteBackend:
+
+    def reindex(self, recipe_ids):
+        recipe_ids = list(recipe_ids)
+        placeholders = ', '.join(['%s'] * len(recipe_ids))
+        names = ingredient_names(
+            f"group_concat({Ingredient._meta.db_table}.name, ' ')"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+                recipe_ids
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, ingredients, text) '
+                f"SELECT id, name, COALESCE(({names}), ''), text "
+                f'FROM {RECIPE} WHERE id IN ({placeholders})',
+                recipe_ids
+            )
+
+    def search(self, queryset, words):
+        query = ' '.join(f'"{word}"*' for word in words)
+        return queryset.extra(
+            select={'search_rank': f'-{FTS_TABLE}.rank'},
+            tables=[FTS_TABLE],
+            where=[
+                f'{FTS_TABLE}.rowid = {RECIPE}.id',
+                f'{FTS_TABLE} MATCH %s',
+            ],
+            params=[query],
+        )
+
+
+class DatabaseBackend:
+
+    def reindex(self, recipe_ids):
+        return None
+
+    def search(self, queryset, words):
+        condition = Q()
+        for word in words:
+            condition &= (
+                Q(name__icontains=word)
+                | Q(text__icontains=word)
+                | Q(ingredients__name__icontains=word)
+            )
+        return queryset.filter(pk__in=Recipe.objects.filter(
+            condition
+        ).values('pk')).extra(select={'search_rank': 0})
+
+
+BACKENDS = {
+    'postgresql': PostgresBackend,
+    'sqlite': SqliteBackend,
+}
+
+
+def get_backend():
+    return BACKENDS.get(connection.vendor, DatabaseBackend)()
+
+
+def search_recipes(queryset, term):
+    words = tokens(term)
+    if not words:
+        return queryset
+    return get_backend().search(queryset, words).order_by(
+        '-search_rank', '-pub_date', '-id'
+    )
+
+
+def reindex_recipes(recipe_ids=None):
+    if recipe_ids is None:
+        recipe_ids = Recipe.objects.values_list('pk', flat=True)
+    recipe_ids = list(recipe_ids)
+    backend = get_backend()
+    batch_size = 500
+    for start in range(0, len(recipe_ids), batch_size):
+        backend.reindex(recipe_ids[start:start + batch_size])
@@ -1,10 +1,13 @@
-from django.shortcuts import get_object_or_404
+from django.db import transaction
 from rest_framework import serializers
 from users.serializers import CustomUserSerializer
 
 from .fields import Base64ImageField
-from .models import (Favorite, Ingredient, IngredientInRecipe, Purchase,
-                     Recipe, Tag)
+from .flags import personal_flags
+from .images import rendition_urls, schedule
+from .models import Ingredient, IngredientInRecipe, Purchase, Recipe, Tag
+from .shopping_list import refresh_shopping_lists
+from .timelines import schedule_push
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -39,27 +42,49 @@ class ShowRecipeSerializer(serializers.ModelSerializer):
     ingredients = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    image_renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
         fields = ('id', 'tags', 'author', 'ingredients',
                   'is_favorited', 'is_in_shopping_cart',
-                  'name', 'image', 'text', 'cooking_time')
+                  'name', 'image', 'image_renditions', 'text',
+                  'cooking_time')
+
+    def get_image_renditions(self, obj):
+        return rendition_urls(obj, self.context.get('request'))
 
     def get_is_favorited(self, obj):
-        user = self.context.get('request').user
-        return user.is_authenticated and Favorite.objects.filter(
-            recipe=obj, user=user
-        ).exists()
+        return personal_flags(self.context).is_favorited(obj)
 
     def get_is_in_shopping_cart(self, obj):
-        user = self.context.get('request').user
-        return user.is_authenticated and Purchase.objects.filter(
-            recipe=obj, user=user
-        ).exists()
+        return personal_flags(self.context).is_in_shopping_cart(obj)
 
     def get_ingredients(self, obj):
-        objects = IngredientInRecipe.objects.filter(recipe=obj)
+        objects = obj.ingredient_amounts.all()
+        serializer = IngredientRecipeSerializer(objects, many=True)
+        return serializer.data
+
+
+class RecipeMatchSerializer(ShowRecipeSerializer):
+    matched_count = serializers.SerializerMethodField()
+    missing_ingredients = serializers.SerializerMethodField()
+
+    class Meta(ShowRecipeSerializer.Meta):
+        fields = ShowRecipeSerializer.Meta.fields + (
+            'matched_count', 'missing_ingredients'
+        )
+
+    def get_matched_count(self, obj):
+        return self.context['matches'][obj.id].matched
+
+    def get_missing_ingredients(self, obj):
+        missing = set(self.context['matches'][obj.id].missing)
+        objects = [
+            ingredient_amount
+            for ingredient_amount in obj.ingredient_amounts.all()
+            if ingredient_amount.ingredient_id in missing
+        ]
         serializer = IngredientRecipeSerializer(objects, many=True)
         return serializer.data
 
@@ -115,33 +140,74 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Ингредиенты повторяются!'
             )
+        if len(Ingredient.objects.in_bulk(id_ingredients)) < len(
+            id_ingredients
+        ):
+            raise serializers.ValidationError(
+                'Такого ингредиента нет!'
+            )
         for ingredient in ingredients_set:
-            try:
-                Ingredient.objects.get(id=ingredient['id'])
-            except Ingredient.DoesNotExist:
-                raise serializers.ValidationError(
-                    'Такого ингредиента нет!'
-                )
-            amount = ingredient['amount']
-            if amount <= 0:
+            if ingredient['amount'] <= 0:
                 raise serializers.ValidationError(
                     'amount не должно быть равно 0 или меньше 0!'
                 )
         return data
 
     def ingredient_create(self, ingredient_data, recipe):
-        for ingredient in ingredient_data:
-            ingredient_model = get_object_or_404(
-                Ingredient,
-                id=ingredient['id']
-            )
-            amount = ingredient['amount']
-            IngredientInRecipe.objects.create(
-                ingredient=ingredient_model,
+        IngredientInRecipe.objects.bulk_create([
+            IngredientInRecipe(
+                ingredient_id=ingredient['id'],
                 recipe=recipe,
-                amount=amount
+                amount=ingredient['amount']
+            )
+            for ingredient in ingredient_data
+        ])
+
+    def ingredient_update(self, ingredient_data, recipe):
+        existing = {
+            ingredient_amount.ingredient_id: ingredient_amount
+            for ingredient_amount in IngredientInRecipe.objects.filter(
+                recipe=recipe
             )
+        }
+        amounts = {
+            ingredient['id']: ingredient['amount']
+            for ingredient in ingredient_data
+        }
+        removed = [
+            ingredient_amount.id
+            for ingredient_id, ingredient_amount in existing.items()
+            if ingredient_id not in amounts
+        ]
+        if removed:
+            IngredientInRecipe.objects.filter(id__in=removed).delete()
+        changed = []
+        for ingredient_id, amount in amounts.items():
+            ingredient_amount = existing.get(ingredient_id)
+            if ingredient_amount is not None and (
+                    ingredient_amount.amount != amount):
+                ingredient_amount.amount = amount
+                changed.append(ingredient_amount)
+        if changed:
+            IngredientInRecipe.objects.bulk_update(changed, ['amount'])
+        added = [
+            ingredient for ingredient in ingredient_data
+            if ingredient['id'] not in existing
+        ]
+        if added:
+            self.ingredient_create(added, recipe)
+        if removed or changed or added:
+            refresh_shopping_lists(
+                Purchase.objects.filter(recipe=recipe).values_list(
+                    'user_id', flat=True
+                ),
+                set(existing) | set(amounts)
+            )
+        getattr(recipe, '_prefetched_objects_cache', {}).pop(
+            'ingredient_amounts', None
+        )
 
+    @transaction.atomic
     def create(self, validated_data):
         tags_data = validated_data.pop('tags')
         ingredient_data = validated_data.pop('ingredients')
@@ -150,21 +216,26 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             author=author, **validated_data)
         recipe.tags.set(tags_data)
         self.ingredient_create(ingredient_data, recipe)
+        schedule(recipe)
+        schedule_push(recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         ingredient_data = validated_data.pop('ingredients')
         tags_data = validated_data.pop('tags')
-        IngredientInRecipe.objects.filter(recipe=instance).delete()
-        self.ingredient_create(ingredient_data, instance)
+        self.ingredient_update(ingredient_data, instance)
+        if 'image' in validated_data:
+            instance.renditions_ready = False
         super(RecipeCreateSerializer, self).update(instance, validated_data)
         instance.tags.set(tags_data)
+        if 'image' in validated_data:
+            schedule(instance)
         return instance
 
     def to_representation(self, instance):
+        request = self.context.get('request')
         return ShowRecipeSerializer(
-            instance,
-            context={
-                'request': self.context.get('request')
-            }
+            Recipe.objects.for_feed().get(pk=instance.pk),
+            context={'request': request}
         ).data
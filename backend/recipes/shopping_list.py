@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models import Sum
+from users.models import User
+
+from .models import IngredientInRecipe, ShoppingListItem
+
+USER = 'recipe__in_purchases__user'
+
+
+def live_totals(user_ids, ingredient_ids=None):
+    queryset = IngredientInRecipe.objects.filter(**{f'{USER}__in': user_ids})
+    if ingredient_ids is not None:
+        queryset = queryset.filter(ingredient_id__in=ingredient_ids)
+    return {
+        (row[USER], row['ingredient']): row['total']
+        for row in queryset.values(USER, 'ingredient').annotate(
+            total=Sum('amount')
+        ).order_by()
+    }
+
+
+def stored_totals(user_ids, ingredient_ids=None):
+    queryset = ShoppingListItem.objects.filter(user_id__in=user_ids)
+    if ingredient_ids is not None:
+        queryset = queryset.filter(ingredient_id__in=ingredient_ids)
+    return {
+        (item.user_id, item.ingredient_id): item
+        for item in queryset
+    }
+
+
+def lock_users(user_ids):
+    return list(User.objects.select_for_update().filter(
+        pk__in=user_ids
+    ).order_by('pk').values_list('pk', flat=True))
+
+
+@transaction.atomic
+def refresh_shopping_lists(user_ids, ingredient_ids=None):
+    user_ids = lock_users(list(user_ids))
+    if not user_ids:
+        return 0, 0, 0
+    if ingredient_ids is not None:
+        ingredient_ids = list(ingredient_ids)
+    live = live_totals(user_ids, ingredient_ids)
+    stored = stored_totals(user_ids, ingredient_ids)
+    removed = [item.id for key, item in stored.items() if key not in live]
+    changed = []
+    for key, total in live.items():
+        item = stored.get(key)
+        if item is not None and item.total != total:
+            item.total = total
+            changed.append(item)
+    added = [
+        ShoppingListItem(user_id=user_id, ingredient_id=ingredient_id,
+                         total=total)
+        for (user_id, ingredient_id), total in live.items()
+        if (user_id, ingredient_id) not in stored
+    ]
+    if removed:
+        ShoppingListItem.objects.filter(id__in=removed).delete()
+    if changed:
+        ShoppingListItem.objects.bulk_update(changed, ['total'])
+    if added:
+        ShoppingListItem.objects.bulk_create(added)
+    return len(added), len(changed), len(removed)
+
+
+def recipe_ingredient_ids(recipe_id):
+    return list(IngredientInRecipe.objects.filter(
+        recipe_id=recipe_id
+    ).values_list('ingredient_id', flat=True))
@@ -0,0 +1,119 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from users.models import Follow, User
+
+from .cache import bump_version
+from .matcher import matcher
+from .models import (Favorite, Ingredient, IngredientInRecipe, Purchase,
+                     Recipe, Tag)
+from .search import reindex_recipes
+
+SEARCH_FIELDS = {'name', 'text'}
+AUTHOR_FIELDS = {'email', 'username', 'first_name', 'last_name'}
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def tags_changed(sender, **kwargs):
+    bump_version('tags')
+
+
+@receiver([post_save, post_delete], sender=Ingredient)
+def ingredients_changed(sender, **kwargs):
+    bump_version('ingredients')
+
+
+@receiver([post_save, pre_delete], sender=Tag)
+def touch_tag_recipes(sender, instance, created=False, **kwargs):
+    if not created:
+        Recipe.objects.filter(tags=instance).touch()
+
+
+@receiver([post_save, pre_delete], sender=Ingredient)
+def touch_ingredient_recipes(sender, instance, created=False, **kwargs):
+    if not created:
+        Recipe.objects.filter(ingredients=instance).touch()
+
+
+def schedule_reindex(recipe_ids):
+    transaction.on_commit(lambda: reindex_recipes(recipe_ids))
+
+
+def schedule_refresh(recipe_ids):
+    def refresh():
+        reindex_recipes(recipe_ids)
+        matcher.update(recipe_ids)
+    transaction.on_commit(refresh)
+
+
+@receiver([post_save, post_delete], sender=Recipe)
+def recipe_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    schedule_refresh([instance.pk])
+
+
+@receiver(post_save, sender=IngredientInRecipe)
+def recipe_ingredients_changed(sender, instance, **kwargs):
+    Recipe.objects.filter(pk=instance.recipe_id).touch()
+    schedule_refresh([instance.recipe_id])
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_renamed(sender, instance, created, **kwargs):
+    if not created:
+        schedule_reindex(list(IngredientInRecipe.objects.filter(
+            ingredient=instance
+        ).values_list('recipe_id', flat=True)))
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, created, update_fields=None,
+                   **kwargs):
+    if created or (
+            update_fields and not AUTHOR_FIELDS.intersection(update_fields)):
+        return
+    Recipe.objects.filter(author=instance).touch()
+
+
+def shift_counter(model, pk, field, delta):
+    model.objects.filter(pk=pk).update(
+        **{field: Greatest(F(field) + delta, 0)}
+    )
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=Purchase)
+def recipe_relation_created(sender, instance, created, **kwargs):
+    if created:
+        shift_counter(Recipe, instance.recipe_id, sender.counter_field, 1)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=Purchase)
+def recipe_relation_deleted(sender, instance, **kwargs):
+    shift_counter(Recipe, instance.recipe_id, sender.counter_field, -1)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    if created:
+        shift_counter(User, instance.author_id, 'recipes_count', 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    shift_counter(User, instance.author_id, 'recipes_count', -1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        shift_counter(User, instance.author_id, 'followers_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    shift_counter(User, instance.author_id, 'followers_count', -1)
@@ -0,0 +1,31 @@
+from django.test import override_settings
+from recipes.checks import shared_cache_check
+from recipes.models import Tag
+
+
+def test_process_local_catalog_cache_is_an_error():
+    with override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}):
+        errors = shared_cache_check(None)
+    assert [error.id for error in errors] == ['recipes.E001']
+
+
+def test_shared_catalog_cache_passes(tmp_path):
+    with override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }}):
+        assert shared_cache_check(None) == []
+
+
+def test_tag_list_follows_catalog_version(client, tags):
+    response = client.get('/api/tags/')
+    etag = response['ETag']
+    assert client.get(
+        '/api/tags/', HTTP_IF_NONE_MATCH=etag
+    ).status_code == 304
+    Tag.objects.create(name='Ужин', slug='dinner', color='#8775D2')
+    response = client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert len(response.data) == 3
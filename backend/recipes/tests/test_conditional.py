@@ -0,0 +1,28 @@
+def recipe_list_etag(client):
+    response = client.get('/api/recipes/')
+    assert response.status_code == 200
+    return response['ETag']
+
+
+def test_signup_keeps_recipe_list_etag(client, make_recipes):
+    make_recipes(3)
+    etag = recipe_list_etag(client)
+    response = client.post('/api/users/', {
+        'email': 'new@example.com', 'username': 'newcook',
+        'first_name': 'Пётр', 'last_name': 'Сидоров',
+        'password': 'Sup3r-secret-pass',
+    }, format='json')
+    assert response.status_code < 300, response.data
+    assert client.get(
+        '/api/recipes/', HTTP_IF_NONE_MATCH=etag
+    ).status_code == 304
+
+
+def test_author_rename_changes_recipe_list_etag(client, author, make_recipes):
+    make_recipes(3)
+    etag = recipe_list_etag(client)
+    author.first_name = 'Мария'
+    author.save()
+    assert client.get(
+        '/api/recipes/', HTTP_IF_NONE_MATCH=etag
+    ).status_code == 200
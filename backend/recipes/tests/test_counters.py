@@ -0,0 +1,65 @@
+import pytest
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from recipes.models import Favorite, Purchase, Recipe
+from users.models import Follow
+
+
+@pytest.fixture
+def author_client(author):
+    client = APIClient()
+    token, _ = Token.objects.get_or_create(user=author)
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    return client
+
+
+def test_delete_recipe_created_outside_api(author, author_client,
+                                           make_recipes):
+    recipe = make_recipes(1)[0]
+    author.refresh_from_db()
+    assert author.recipes_count == 0
+    response = author_client.delete(f'/api/recipes/{recipe.id}/')
+    assert response.status_code == 204
+    author.refresh_from_db()
+    assert author.recipes_count == 0
+
+
+@pytest.mark.parametrize('model, path, field', [
+    (Favorite, 'favorite', 'favorites_count'),
+    (Purchase, 'shopping_cart', 'purchases_count'),
+])
+def test_delete_relation_created_outside_api(user, user_client, make_recipes,
+                                             model, path, field):
+    recipe = make_recipes(1)[0]
+    model.objects.bulk_create([model(user=user, recipe=recipe)])
+    response = user_client.delete(f'/api/recipes/{recipe.id}/{path}/')
+    assert response.status_code == 204
+    recipe.refresh_from_db()
+    assert getattr(recipe, field) == 0
+
+
+def test_unsubscribe_created_outside_api(user, user_client, author):
+    Follow.objects.bulk_create([Follow(user=user, author=author)])
+    response = user_client.delete(f'/api/users/{author.id}/subscribe/')
+    assert response.status_code == 204
+    author.refresh_from_db()
+    assert author.followers_count == 0
+
+
+def test_orm_writes_keep_counters(user, author, make_recipes):
+    recipe = Recipe.objects.create(
+        author=author, name='Рецепт', text='Описание', cooking_time=10,
+        image='recipe_image/test.png'
+    )
+    Favorite.objects.create(user=user, recipe=recipe)
+    Purchase.objects.create(user=user, recipe=recipe)
+    Follow.objects.create(user=user, author=author)
+    recipe.refresh_from_db()
+    author.refresh_from_db()
+    assert (recipe.favorites_count, recipe.purchases_count) == (1, 1)
+    assert (author.recipes_count, author.followers_count) == (1, 1)
+    Favorite.objects.filter(recipe=recipe).delete()
+    Follow.objects.all().delete()
+    recipe.delete()
+    author.refresh_from_db()
+    assert (author.recipes_count, author.followers_count) == (0, 0)
@@ -0,0 +1,34 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from recipes.cache import local_cache
+from recipes.models import Favorite, Purchase
+
+
+def recipe_list_queries(client, limit):
+    cache.clear()
+    local_cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(f'/api/recipes/?limit={limit}')
+    assert response.status_code == 200
+    assert len(response.data['results']) == limit
+    return len(context)
+
+
+def test_feed_queries_do_not_depend_on_page_size(user, user_client,
+                                                 make_recipes):
+    recipes = make_recipes(50)
+    Favorite.objects.create(user=user, recipe=recipes[0])
+    Purchase.objects.create(user=user, recipe=recipes[1])
+    assert (
+        recipe_list_queries(user_client, 3)
+        == recipe_list_queries(user_client, 50)
+    )
+
+
+def test_anonymous_feed_queries_do_not_depend_on_page_size(client,
+                                                           make_recipes):
+    make_recipes(50)
+    assert (
+        recipe_list_queries(client, 3) == recipe_list_queries(client, 50)
+    )
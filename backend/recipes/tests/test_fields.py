@@ -0,0 +1,56 @@
+import base64
+import os
+import tracemalloc
+
+import pytest
+from recipes.fields import DECODE_CHUNK_SIZE, Base64ImageField
+from rest_framework.exceptions import ValidationError
+
+PNG_HEADER = b'\x89PNG\r\n\x1a\n'
+
+
+def data_uri(content, width=None):
+    encoded = base64.b64encode(content).decode()
+    if width:
+        encoded = '\r\n'.join(
+            encoded[position:position + width]
+            for position in range(0, len(encoded), width)
+        )
+    return 'data:image/png;base64,' + encoded
+
+
+@pytest.fixture
+def upload_settings(settings, tmp_path):
+    settings.FILE_UPLOAD_TEMP_DIR = str(tmp_path)
+    settings.FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
+    return settings
+
+
+@pytest.mark.parametrize('width', [None, 76, 64])
+def test_decodes_line_wrapped_base64(upload_settings, width):
+    content = PNG_HEADER + os.urandom(3 * DECODE_CHUNK_SIZE + 5)
+    file = Base64ImageField(max_size=len(content) + 2).decode(
+        data_uri(content, width)
+    )
+    assert file.content_type == 'image/png'
+    assert file.size == len(content)
+    assert file.read() == content
+
+
+def test_rejects_characters_outside_alphabet(upload_settings):
+    with pytest.raises(ValidationError):
+        Base64ImageField().decode(data_uri(PNG_HEADER)[:-4] + '!!!!')
+
+
+def test_upload_peak_memory_is_bounded_by_chunk(upload_settings):
+    content = PNG_HEADER + os.urandom(4 * 1024 * 1024)
+    data = data_uri(content, 76)
+    field = Base64ImageField(max_size=len(content) + 2)
+    tracemalloc.start()
+    try:
+        file = field.decode(data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert file.size == len(content)
+    assert peak < 8 * DECODE_CHUNK_SIZE
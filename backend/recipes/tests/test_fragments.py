@@ -0,0 +1,24 @@
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import call_command
+
+
+def fragment_cache_stats(*args):
+    out = StringIO()
+    call_command('fragment_cache_stats', *args, stdout=out)
+    return out.getvalue().strip()
+
+
+def test_stats_command_sees_counters_of_serving_process(
+        client, make_recipes):
+    make_recipes(3)
+    client.get('/api/recipes/')
+    client.get('/api/recipes/?limit=1')
+    caches['local'].clear()
+    assert fragment_cache_stats('--reset') == (
+        'Попаданий: 1, промахов: 3, доля попаданий: 0.25'
+    )
+    assert fragment_cache_stats() == (
+        'Попаданий: 0, промахов: 0, доля попаданий: None'
+    )
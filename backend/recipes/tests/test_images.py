@@ -0,0 +1,83 @@
+import io
+import os
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from PIL import Image
+from recipes.images import process_image, rendition_name
+from recipes.models import Recipe
+
+
+@pytest.fixture
+def sync_pipeline(settings, image):
+    settings.IMAGE_PIPELINE_MODE = 'sync'
+    return image
+
+
+@pytest.fixture
+def stored_image(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), 'red').save(buffer, 'PNG')
+    return default_storage.save(
+        'recipe_image/photo.png', ContentFile(buffer.getvalue())
+    )
+
+
+def post_recipe(client, tags, ingredients, image):
+    return client.post('/api/recipes/', {
+        'name': 'Рецепт', 'text': 'Описание', 'cooking_time': 10,
+        'tags': [tag.id for tag in tags],
+        'ingredients': [{'id': ingredients[0].id, 'amount': 5}],
+        'image': image,
+    }, format='json')
+
+
+def test_sync_pipeline_failure_is_logged_and_request_succeeds(
+        user_client, tags, ingredients, sync_pipeline, monkeypatch,
+        caplog, django_capture_on_commit_callbacks):
+    def fail(image):
+        raise OSError('broken image')
+
+    monkeypatch.setattr('recipes.images.ImageOps.exif_transpose', fail)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = post_recipe(user_client, tags, ingredients, sync_pipeline)
+    assert response.status_code == 201
+    recipe = Recipe.objects.get(pk=response.data['id'])
+    assert recipe.renditions_ready is False
+    assert default_storage.exists(recipe.image.name)
+    assert 'Не удалось обработать картинку' in caplog.text
+
+
+def test_sync_pipeline_builds_renditions(
+        user_client, tags, ingredients, sync_pipeline,
+        django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        response = post_recipe(user_client, tags, ingredients, sync_pipeline)
+    recipe = Recipe.objects.get(pk=response.data['id'])
+    assert recipe.renditions_ready is True
+    assert default_storage.exists(rendition_name(recipe.image.name, 'card'))
+
+
+def test_original_is_replaced_without_being_deleted(
+        stored_image, author, monkeypatch):
+    recipe = Recipe.objects.create(
+        author=author, name='Рецепт', text='Описание', cooking_time=10,
+        image=stored_image
+    )
+    deleted = []
+    delete = FileSystemStorage.delete
+
+    def spy(storage, name):
+        deleted.append(name)
+        delete(storage, name)
+
+    monkeypatch.setattr(FileSystemStorage, 'delete', spy)
+    process_image(recipe.pk, stored_image)
+    assert stored_image not in deleted
+    with default_storage.open(stored_image) as file:
+        assert Image.open(file).size == (8, 8)
+    assert sorted(os.listdir(default_storage.path('recipe_image'))) == [
+        'photo.png', 'renditions'
+    ]
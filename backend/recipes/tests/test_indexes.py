@@ -0,0 +1,119 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from recipes.models import Recipe
+from recipes.timelines import push, rebuild_timeline
+from users.models import Follow, User
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+        return '\n'.join(
+            ' '.join(map(str, row)) for row in cursor.fetchall()
+        )
+
+
+def captured(action):
+    with CaptureQueriesContext(connection) as context:
+        action()
+    return [query['sql'] for query in context.captured_queries]
+
+
+def hot_query(queries, *parts):
+    matching = [
+        sql for sql in queries if all(part in sql for part in parts)
+    ]
+    assert matching, f'Нет запроса с {parts}'
+    return matching[0]
+
+
+@pytest.fixture
+def world(user, author, make_recipes, tags):
+    recipes = make_recipes(5)
+    Follow.objects.create(user=user, author=author)
+    User.objects.filter(pk=author.pk).update(followers_count=1)
+    rebuild_timeline(user.pk)
+    return {'author': author, 'recipes': recipes, 'tags': tags}
+
+
+def get(path):
+    return lambda client, world: client.get(path.format(**world))
+
+
+def push_recipe(client, world):
+    push(Recipe.objects.get(pk=world['recipes'][0].pk))
+
+
+def rename_tag(client, world):
+    tag = world['tags'][0]
+    tag.name = 'Полдник'
+    tag.save()
+
+
+HOT_QUERIES = [
+    (
+        'recipes-list', get('/api/recipes/?limit=6'),
+        ('FROM "recipes_recipe" ORDER BY',),
+        'recipe_pub_date_id_idx',
+    ),
+    (
+        'author-recipes', get('/api/recipes/?author={author.pk}&limit=3'),
+        ('FROM "recipes_recipe" WHERE "recipes_recipe"."author_id"',
+         'ORDER BY'),
+        'recipe_author_pub_date_idx',
+    ),
+    (
+        'subscriptions-recipes',
+        get('/api/users/subscriptions/?recipes_limit=3'),
+        ('FROM "recipes_recipe" WHERE ("recipes_recipe"."id" IN (SELECT',),
+        'recipe_author_pub_date_idx',
+    ),
+    (
+        'recipes-tags', get('/api/recipes/?tags=breakfast&tags=lunch'),
+        ('AS "tags_exists" FROM "recipes_recipe"', 'ORDER BY'),
+        'recipes_recipe_tags_recipe_id_tag_id',
+    ),
+    (
+        'timeline', get('/api/recipes/feed/'),
+        ('FROM "recipes_timelineentry" WHERE', 'ORDER BY'),
+        'timeline_user_pub_date_idx',
+    ),
+    (
+        'author-followers', push_recipe,
+        ('FROM "users_follow" WHERE "users_follow"."author_id"',),
+        'follow_author_user_idx',
+    ),
+    (
+        'tag-recipes', rename_tag,
+        ('UPDATE "recipes_recipe" SET "updated_at"',),
+        'recipes_recipe_tags_tag_recipe_idx',
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    'action, parts, index',
+    [case[1:] for case in HOT_QUERIES],
+    ids=[case[0] for case in HOT_QUERIES]
+)
+def test_hot_query_uses_index(user_client, world, action, parts, index):
+    sql = hot_query(captured(lambda: action(user_client, world)), *parts)
+    plan = explain(sql)
+    assert index in plan, plan
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='функциональный индекс по lower(name) есть только на Postgres'
+)
+def test_ingredient_prefix_uses_index(client, settings, ingredients):
+    settings.INGREDIENT_AUTOCOMPLETE_BACKEND = 'database'
+    sql = hot_query(
+        captured(lambda: client.get('/api/ingredients/?name=ингр')),
+        'FROM "recipes_ingredient"', 'LIKE'
+    )
+    plan = explain(sql)
+    assert 'recipes_ingredient_lower_name_idx' in plan, plan
@@ -0,0 +1,22 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from recipes.models import Ingredient
+
+
+@pytest.mark.parametrize('name, content, row', [
+    ('ingredients.csv', 'name\nсоль\n', 1),
+    (
+        'ingredients.json',
+        '[{"name": "соль", "measurement_unit": "г"}, {"name": "сахар"}]',
+        2,
+    ),
+])
+def test_missing_field_names_field_and_row(db, tmp_path, name, content, row):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    with pytest.raises(
+        CommandError, match=f'Строка {row}: нет поля «measurement_unit»'
+    ):
+        call_command('loadjson', path=str(path))
+    assert not Ingredient.objects.exists()
@@ -0,0 +1,76 @@
+import threading
+
+from recipes.matcher import RecipeIndex, RecipeMatcher
+from recipes.models import IngredientInRecipe
+
+ROWS = [(1, 10), (1, 11), (2, 11), (2, 12), (3, 10)]
+
+
+def snapshot(index):
+    return (
+        {key: list(value) for key, value in index.postings.items()},
+        {key: list(value) for key, value in index.recipes.items()},
+    )
+
+
+def test_updated_leaves_original_index_intact():
+    index = RecipeIndex(ROWS)
+    before = snapshot(index)
+    updated = index.updated({1: [12, 13], 2: [], 4: [10]})
+    assert snapshot(index) == before
+    assert [match.recipe_id for match in updated.match([10])] == [4, 3]
+    assert [match.recipe_id for match in updated.match([13])] == [1]
+
+
+def test_readers_never_see_partial_update():
+    matcher = RecipeMatcher()
+    matcher.index = RecipeIndex(
+        (recipe_id, ingredient_id)
+        for recipe_id in range(200) for ingredient_id in range(10)
+    )
+    errors = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            try:
+                matcher.index.match(range(10))
+            except Exception as error:
+                errors.append(error)
+
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    for reader in readers:
+        reader.start()
+    for step in range(300):
+        recipe_id = step % 200
+        matcher.index = matcher.index.updated(
+            {recipe_id: [] if step % 2 else list(range(10))}
+        )
+    done.set()
+    for reader in readers:
+        reader.join()
+    assert errors == []
+
+
+def test_peer_worker_replays_changes_without_rebuild(
+        monkeypatch, make_recipes):
+    recipes = make_recipes(3)
+    writer, peer = RecipeMatcher(), RecipeMatcher()
+    writer.get_index()
+    peer.get_index()
+    builds = []
+    monkeypatch.setattr(
+        RecipeMatcher, 'build', lambda self: builds.append(self)
+    )
+    IngredientInRecipe.objects.filter(recipe=recipes[0]).delete()
+    writer.update([recipe.pk for recipe in recipes[:1]])
+    assert builds == []
+    assert writer.index is not None
+    for matcher in (writer, peer):
+        found = {match.recipe_id for match in matcher.match(
+            IngredientInRecipe.objects.values_list(
+                'ingredient_id', flat=True
+            )
+        )}
+        assert found == {recipe.pk for recipe in recipes[1:]}
+    assert builds == []
@@ -0,0 +1,98 @@
+import pytest
+from django.conf import settings
+from recipes.models import Favorite, Purchase
+from recipes.timelines import rebuild_timeline
+from users.models import Follow
+
+
+@pytest.fixture
+def strict(settings):
+    settings.QUERY_BUDGET_STRICT = True
+    settings.IMAGE_PIPELINE_MODE = 'sync'
+
+
+@pytest.fixture
+def catalog(user, author, make_recipes, ingredients):
+    recipes = make_recipes(5)
+    Follow.objects.create(user=user, author=author)
+    rebuild_timeline(user.pk)
+    Favorite.objects.create(user=user, recipe=recipes[0])
+    Purchase.objects.create(user=user, recipe=recipes[1])
+    return recipes
+
+
+def recipe_data(tags, ingredients, image=None):
+    data = {
+        'name': 'Рецепт', 'text': 'Описание', 'cooking_time': 10,
+        'tags': [tag.id for tag in tags],
+        'ingredients': [
+            {'id': ingredient.id, 'amount': 5}
+            for ingredient in ingredients
+        ],
+    }
+    if image:
+        data['image'] = image
+    return data
+
+
+REQUESTS = {
+    'GET recipes-list': lambda client, context: client.get(
+        '/api/recipes/?limit=6'
+    ),
+    'GET recipes-detail': lambda client, context: client.get(
+        f'/api/recipes/{context["recipes"][0].id}/'
+    ),
+    'POST recipes-list': lambda client, context: client.post(
+        '/api/recipes/',
+        recipe_data(context['tags'], context['ingredients'][:10],
+                    context['image']),
+        format='json'
+    ),
+    'PATCH recipes-detail': lambda client, context: client.patch(
+        f'/api/recipes/{context["own"].id}/',
+        recipe_data(context['tags'], context['ingredients'][2:12],
+                    context['image']),
+        format='json'
+    ),
+    'GET recipes-cook': lambda client, context: client.get(
+        '/api/recipes/cook/?ingredients='
+        f'{context["ingredients"][0].id},{context["ingredients"][1].id}'
+    ),
+    'GET recipes-feed': lambda client, context: client.get(
+        '/api/recipes/feed/'
+    ),
+    'GET users-list': lambda client, context: client.get('/api/users/'),
+    'GET users-detail': lambda client, context: client.get(
+        f'/api/users/{context["author"].id}/'
+    ),
+    'GET users-subscriptions': lambda client, context: client.get(
+        '/api/users/subscriptions/'
+    ),
+    'GET tags-list': lambda client, context: client.get('/api/tags/'),
+    'GET indegrients-list': lambda client, context: client.get(
+        '/api/ingredients/?name=ингр'
+    ),
+}
+
+
+def test_every_budget_is_exercised():
+    assert set(REQUESTS) == set(settings.QUERY_BUDGETS)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('route', sorted(REQUESTS))
+def test_route_fits_budget_in_strict_mode(
+        strict, route, user, user_client, author, tags, ingredients,
+        catalog, make_recipes, image):
+    own = make_recipes(1)[0]
+    own.author = user
+    own.save()
+    Follow.objects.create(user=author, author=user)
+    Purchase.objects.create(user=author, recipe=own)
+    context = {
+        'recipes': catalog, 'own': own, 'author': author, 'tags': tags,
+        'ingredients': ingredients, 'image': image,
+    }
+    response = REQUESTS[route](user_client, context)
+    assert response.status_code < 300, response.data
+    assert response.status_code != 304
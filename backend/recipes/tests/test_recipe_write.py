@@ -0,0 +1,76 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from recipes.models import (
+    IngredientInRecipe, Purchase, Recipe, ShoppingListItem
+)
+
+
+def recipe_data(tags, ingredients, amounts, image=None):
+    data = {
+        'name': 'Рецепт', 'text': 'Описание', 'cooking_time': 10,
+        'tags': [tag.id for tag in tags],
+        'ingredients': [
+            {'id': ingredient.id, 'amount': amount}
+            for ingredient, amount in zip(ingredients, amounts)
+        ],
+    }
+    if image:
+        data['image'] = image
+    return data
+
+
+def test_create_query_count_independent_of_ingredients(
+        user_client, tags, ingredients, image):
+    counts = []
+    for count in (3, 20):
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                '/api/recipes/',
+                recipe_data(tags, ingredients[:count], [5] * count, image),
+                format='json'
+            )
+        assert response.status_code == 201, response.data
+        assert len(response.data['ingredients']) == count
+        counts.append(len(context))
+    assert counts[0] == counts[1]
+
+
+def update_queries(client, recipe, tags, ingredients, amounts):
+    with CaptureQueriesContext(connection) as context:
+        response = client.patch(
+            f'/api/recipes/{recipe.id}/',
+            recipe_data(tags, ingredients, amounts),
+            format='json'
+        )
+    assert response.status_code == 200, response.data
+    return len(context)
+
+
+def test_mixed_update_query_count_independent_of_ingredients(
+        user, user_client, tags, ingredients):
+    counts = []
+    for size in (1, 5):
+        Purchase.objects.all().delete()
+        ShoppingListItem.objects.all().delete()
+        recipe = Recipe.objects.create(
+            author=user, name='Рецепт', text='Описание', cooking_time=10,
+            image='recipe_image/test.png'
+        )
+        recipe.tags.set(tags)
+        kept = ingredients[:2 * size]
+        IngredientInRecipe.objects.bulk_create([
+            IngredientInRecipe(recipe=recipe, ingredient=ingredient, amount=5)
+            for ingredient in kept + ingredients[20:20 + size]
+        ])
+        Purchase.objects.create(user=user, recipe=recipe)
+        new = kept + ingredients[10:10 + size]
+        amounts = [5] * size + [7] * size + [3] * size
+        counts.append(
+            update_queries(user_client, recipe, tags, new, amounts)
+        )
+        assert dict(recipe.ingredient_amounts.values_list(
+            'ingredient_id', 'amount'
+        )) == {
+            ingredient.id: amount for ingredient, amount in zip(new, amounts)
+        }
+    assert counts[0] == counts[1]
@@ -0,0 +1,82 @@
+from io import StringIO
+
+import pytest
+from backend import routers
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client
+from recipes.models import Recipe
+
+REPLICA = 'replica_1'
+
+pytestmark = [
+    pytest.mark.skipif(
+        REPLICA not in settings.DATABASES,
+        reason='нужна реплика в DB_REPLICAS'
+    ),
+    pytest.mark.django_db(transaction=True, databases='__all__'),
+]
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    if connections['default'].is_in_memory_db():
+        pytest.skip('нужна файловая тестовая база в DB_TEST_NAME')
+    settings.REPLICA_MAX_LAG = 10 ** 6
+    settings.REPLICA_LAG_CHECK_INTERVAL = 0
+    connection = connections[REPLICA]
+    connection.close()
+    name = connection.settings_dict['NAME']
+    connection.settings_dict['NAME'] = str(tmp_path / 'replica.sqlite3')
+    routers.lags.clear()
+    call_command('sync_replicas', stdout=StringIO())
+    yield
+    connection.close()
+    connection.settings_dict['NAME'] = name
+    routers.lags.clear()
+
+
+@pytest.fixture
+def fresh_recipe(replica, author):
+    return Recipe.objects.create(
+        author=author, name='Свежий', text='Описание', cooking_time=10,
+        image='recipe_image/test.png'
+    )
+
+
+def test_get_reads_lagging_replica(client, fresh_recipe):
+    response = client.get(f'/api/recipes/{fresh_recipe.id}/')
+    assert response.status_code == 404
+
+
+def test_lag_over_limit_falls_back_to_primary(
+        settings, client, fresh_recipe):
+    settings.REPLICA_MAX_LAG = 0
+    response = client.get(f'/api/recipes/{fresh_recipe.id}/')
+    assert response.status_code == 200
+
+
+def test_token_client_reads_own_write(client, user_client, fresh_recipe):
+    response = user_client.post(f'/api/recipes/{fresh_recipe.id}/favorite/')
+    assert response.status_code == 201
+    response = user_client.get(f'/api/recipes/{fresh_recipe.id}/')
+    assert response.status_code == 200
+    assert response.data['is_favorited'] is True
+    assert client.get(
+        f'/api/recipes/{fresh_recipe.id}/'
+    ).status_code == 404
+
+
+def test_session_client_stays_logged_in_after_login(
+        replica, django_user_model):
+    django_user_model.objects.create_superuser(
+        username='admin', email='admin@example.com', password='password',
+        first_name='Админ', last_name='Админов'
+    )
+    browser = Client()
+    response = browser.post('/admin/login/?next=/admin/', {
+        'username': 'admin', 'password': 'password',
+    })
+    assert response.status_code == 302
+    assert browser.get('/admin/').status_code == 200
@@ -0,0 +1,60 @@
+import pytest
+from backend.routers import current_request, primary_reads, read_alias
+from django.test import RequestFactory
+from recipes.autocomplete import MemoryBackend
+from recipes.cache import get_or_set
+from recipes.checks import shared_cache_check
+from recipes.matcher import RecipeMatcher
+
+
+@pytest.fixture
+def replica_request():
+    request = RequestFactory().get('/api/tags/')
+    request.replica_alias = 'replica_1'
+    token = current_request.set(request)
+    yield request
+    current_request.reset(token)
+
+
+def test_get_request_reads_from_replica(replica_request):
+    assert read_alias() == 'replica_1'
+    with primary_reads():
+        assert read_alias() == 'default'
+    assert read_alias() == 'replica_1'
+
+
+def test_catalog_fill_reads_from_primary(replica_request):
+    assert get_or_set('tags', 1, '/api/tags/', read_alias) == 'default'
+
+
+@pytest.mark.parametrize('index_class, module, builder', [
+    (MemoryBackend, 'recipes.autocomplete', 'IngredientIndex'),
+    (RecipeMatcher, 'recipes.matcher', 'RecipeIndex'),
+])
+def test_version_stamped_index_reads_from_primary(
+        replica_request, monkeypatch, index_class, module, builder):
+    monkeypatch.setattr(
+        'recipes.autocomplete.get_version', lambda catalog: 1
+    )
+    monkeypatch.setattr(f'{module}.{builder}', lambda rows: read_alias())
+    assert index_class().get_index() == 'default'
+
+
+def test_process_local_pin_cache_is_an_error_with_replicas(settings):
+    settings.DATABASES = {
+        **settings.DATABASES,
+        'replica_1': settings.DATABASES['default'],
+    }
+    settings.REPLICA_PIN_CACHE_ALIAS = 'local'
+    assert any(
+        'REPLICA_PIN_CACHE_ALIAS' in error.msg
+        for error in shared_cache_check(None)
+    )
+
+
+def test_pin_cache_is_not_checked_without_replicas(settings):
+    settings.REPLICA_PIN_CACHE_ALIAS = 'local'
+    assert not any(
+        'REPLICA_PIN_CACHE_ALIAS' in error.msg
+        for error in shared_cache_check(None)
+    )
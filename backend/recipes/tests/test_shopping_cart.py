@@ -0,0 +1,40 @@
+import pytest
+from recipes.models import Purchase
+from recipes.shopping_list import refresh_shopping_lists
+
+
+@pytest.fixture
+def cart(user, make_recipes):
+    recipe, = make_recipes(1)
+    Purchase.objects.create(user=user, recipe=recipe)
+    refresh_shopping_lists([user.pk])
+    return recipe
+
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+def test_download_defaults_to_txt_regardless_of_accept(user_client, cart):
+    response = user_client.get(URL, HTTP_ACCEPT='application/json')
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'text/plain; charset=utf-8'
+    assert b''.join(response.streaming_content).decode() == (
+        'ингредиент 00 - 5 г\nингредиент 01 - 5 г\nингредиент 02 - 5 г\n'
+    )
+
+
+@pytest.mark.parametrize('export_format, content_type', (
+    ('csv', 'text/csv; charset=utf-8'),
+    ('json', 'application/json'),
+))
+def test_download_format_from_query(user_client, cart, export_format,
+                                    content_type):
+    response = user_client.get(
+        f'{URL}?format={export_format}', HTTP_ACCEPT='text/plain'
+    )
+    assert response.status_code == 200
+    assert response['Content-Type'] == content_type
+
+
+def test_download_unknown_format(user_client, cart):
+    assert user_client.get(f'{URL}?format=xml').status_code == 404
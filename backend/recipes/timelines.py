@@ -0,0 +1,161 @@
+from heapq import merge
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from users.models import Follow
+from users.pagination import KeysetPagination
+
+from .models import Recipe, TimelineEntry
+
+
+def timeline_size():
+    return getattr(settings, 'TIMELINE_SIZE', 500)
+
+
+def fanout_limit():
+    return getattr(settings, 'TIMELINE_FANOUT_LIMIT', 10000)
+
+
+def batch_size():
+    return getattr(settings, 'TIMELINE_BATCH_SIZE', 1000)
+
+
+def is_celebrity(author):
+    return author.followers_count > fanout_limit()
+
+
+def before(pub_date, recipe_id, field):
+    return Q(pub_date__lt=pub_date) | Q(
+        pub_date=pub_date, **{f'{field}__lt': recipe_id}
+    )
+
+
+def trim_timelines(user_ids):
+    size = timeline_size()
+    overfull = TimelineEntry.objects.filter(
+        user_id__in=user_ids
+    ).values('user_id').annotate(entries=Count('id')).filter(
+        entries__gt=size + getattr(settings, 'TIMELINE_TRIM_SLACK', 100)
+    ).values_list('user_id', flat=True)
+    for user_id in list(overfull):
+        entries = TimelineEntry.objects.filter(user_id=user_id)
+        pub_date, recipe_id = entries.order_by(
+            '-pub_date', '-recipe_id'
+        ).values_list('pub_date', 'recipe_id')[size - 1]
+        entries.filter(before(pub_date, recipe_id, 'recipe_id')).delete()
+
+
+def insert_entries(user_ids, recipes):
+    entries = [
+        TimelineEntry(user_id=user_id, recipe_id=recipe_id,
+                      pub_date=pub_date)
+        for user_id in user_ids
+        for recipe_id, pub_date in recipes
+    ]
+    TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+def batches(user_ids):
+    batch = []
+    for user_id in user_ids:
+        batch.append(user_id)
+        if len(batch) == batch_size():
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def push(recipe):
+    if not recipe.author.followers_count or is_celebrity(recipe.author):
+        return
+    follower_ids = Follow.objects.filter(
+        author_id=recipe.author_id
+    ).order_by('user_id').values_list('user_id', flat=True)
+    for batch in batches(follower_ids.iterator(chunk_size=batch_size())):
+        insert_entries(batch, [(recipe.pk, recipe.pub_date)])
+        trim_timelines(batch)
+
+
+def backfill_timeline(user_id, author):
+    if is_celebrity(author):
+        return
+    insert_entries([user_id], Recipe.objects.filter(
+        author=author
+    ).order_by('-pub_date', '-id').values_list(
+        'id', 'pub_date'
+    )[:timeline_size()])
+    trim_timelines([user_id])
+
+
+@transaction.atomic
+def rebuild_timeline(user_id):
+    TimelineEntry.objects.filter(user_id=user_id).delete()
+    insert_entries([user_id], Recipe.objects.filter(
+        author__following__user_id=user_id,
+        author__followers_count__lte=fanout_limit(),
+    ).order_by('-pub_date', '-id').values_list(
+        'id', 'pub_date'
+    )[:timeline_size()])
+
+
+def schedule_push(recipe):
+    transaction.on_commit(lambda: push(recipe))
+
+
+def schedule_backfill(user_id, author):
+    transaction.on_commit(lambda: backfill_timeline(user_id, author))
+
+
+def schedule_rebuild(user_id):
+    transaction.on_commit(lambda: rebuild_timeline(user_id))
+
+
+def read_timeline(user, cursor=None, limit=None):
+    pushed = TimelineEntry.objects.filter(user=user)
+    pulled = Recipe.objects.filter(author_id__in=list(
+        Follow.objects.filter(
+            user=user, author__followers_count__gt=fanout_limit()
+        ).values_list('author_id', flat=True)
+    ))
+    if cursor is not None:
+        pushed = pushed.filter(before(*cursor, 'recipe_id'))
+        pulled = pulled.filter(before(*cursor, 'id'))
+    entries = merge(
+        pushed.order_by('-pub_date', '-recipe_id').values_list(
+            'pub_date', 'recipe_id'
+        )[:limit],
+        pulled.order_by('-pub_date', '-id').values_list(
+            'pub_date', 'id'
+        )[:limit],
+        reverse=True
+    )
+    recipe_ids = []
+    for _, recipe_id in entries:
+        if recipe_id not in recipe_ids:
+            recipe_ids.append(recipe_id)
+    return recipe_ids[:limit]
+
+
+class TimelinePagination(KeysetPagination):
+    ordering = ('-pub_date', '-id')
+
+    def paginate_timeline(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = None
+        cursor = request.query_params.get(self.cursor_query_param)
+        recipe_ids = read_timeline(
+            request.user,
+            self.decode_cursor(Recipe, cursor) if cursor else None,
+            self.page_size + 1
+        )
+        self.has_next = len(recipe_ids) > self.page_size
+        recipes = queryset.in_bulk(recipe_ids[:self.page_size])
+        results = [
+            recipes[recipe_id] for recipe_id in recipe_ids[:self.page_size]
+            if recipe_id in recipes
+        ]
+        self.last = results[-1] if results else None
+        return results
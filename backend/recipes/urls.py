@@ -1,6 +1,7 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import SimpleRouter
 
+from .async_views import ASYNC_ROUTES, offload
 from .views import IngredientViewSet, RecipeViewSet, TagViewSet
 
 router_v1 = SimpleRouter()
@@ -12,3 +13,11 @@ router_v1.register('recipes', RecipeViewSet, basename='recipes')
 urlpatterns = [
     path('api/', include(router_v1.urls)),
 ]
+
+async_urlpatterns = [
+    path('api/', include([
+        re_path(str(url.pattern), offload(url.callback), name=url.name)
+        if url.name in ASYNC_ROUTES else url
+        for url in router_v1.urls
+    ])),
+]
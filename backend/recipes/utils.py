@@ -1,29 +1,42 @@
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.response import Response
 from users.serializers import RecipeSubcribeSerializer
 
-from .models import Recipe
+from .flags import get_personal_flags
+from .models import Purchase, Recipe
+from .shopping_list import recipe_ingredient_ids, refresh_shopping_lists
 
 
-def obj_create(user, model, pk, message):
+def obj_create(request, model, pk, message):
+    user = request.user
     recipe = get_object_or_404(Recipe, id=pk)
     if model.objects.filter(user=user, recipe=recipe).exists():
         return Response(
             message,
             status=status.HTTP_400_BAD_REQUEST
         )
-    model.objects.create(user=user, recipe=recipe)
+    with transaction.atomic():
+        model.objects.create(user=user, recipe=recipe)
+        if model is Purchase:
+            refresh_shopping_lists([user.id], recipe_ingredient_ids(pk))
+    get_personal_flags(request).invalidate(model)
     serializer = RecipeSubcribeSerializer(recipe)
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-def obj_delete(user, model, pk, message):
+def obj_delete(request, model, pk, message):
+    user = request.user
     obj = model.objects.filter(user=user, recipe__id=pk).first()
     if obj is None:
         return Response(
             message,
             status=status.HTTP_400_BAD_REQUEST
         )
-    obj.delete()
+    with transaction.atomic():
+        obj.delete()
+        if model is Purchase:
+            refresh_shopping_lists([user.id], recipe_ingredient_ids(pk))
+    get_personal_flags(request).invalidate(model)
     return Response(status=status.HTTP_204_NO_CONTENT)
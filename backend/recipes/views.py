@@ -1,52 +1,90 @@
-from django.db.models import Sum
-from django.http.response import HttpResponse
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, viewsets
 from rest_framework.decorators import action
-from users.pagination import LimitPageNumberPagination
+from rest_framework.exceptions import ValidationError
+from users.pagination import (LimitPageNumberPagination,
+                              OptionalKeysetPaginationMixin)
 
+from .autocomplete import search_ingredients
+from .exporters import export_shopping_cart
 from .filters import IngredientNameFilter, RecipeFilter
-from .models import (Favorite, Ingredient, IngredientInRecipe, Purchase,
-                     Recipe, Tag)
+from .flags import get_personal_flags
+from .matcher import matcher
+from .mixins import CatalogCacheMixin, ConditionalRecipeMixin
+from .models import Favorite, Ingredient, Purchase, Recipe, Tag
 from .permissions import AdminOrAuthorOrReadOnly
+from .renderers import SHOPPING_CART_RENDERERS, FormatNegotiation
 from .serializers import (IngredientSerializer, RecipeCreateSerializer,
-                          ShowRecipeSerializer, TagSerializer)
+                          RecipeMatchSerializer, ShowRecipeSerializer,
+                          TagSerializer)
+from .shopping_list import recipe_ingredient_ids, refresh_shopping_lists
+from .timelines import TimelinePagination
 from .utils import obj_create, obj_delete
 
 UNELECTED = 'Рецепта нет в избранном!'
 ERROR_FAVORITE = 'Рецепт уже есть в избранном!'
 NOT_ON_THE_LIST = 'В списке нет рецепта, который хотите удалить!'
 ERROR_ON_THE_LIST = 'Рецепт уже есть в списке!'
+NO_INGREDIENTS = 'Укажите хотя бы один ингредиент!'
+INVALID_INGREDIENTS = 'Ингредиенты задаются числовыми id!'
+INVALID_MIN_MATCHES = 'min_matches должно быть целым числом больше 0!'
+FILTER_CHUNK_SIZE = 500
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (permissions.AllowAny,)
+    catalog = 'tags'
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
+    catalog = 'ingredients'
     serializer_class = IngredientSerializer
     permission_classes = (permissions.AllowAny,)
     filterset_class = IngredientNameFilter
 
+    def get_catalog_data(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if name and 'measurement_unit' not in request.query_params:
+            return search_ingredients(name)
+        return super().get_catalog_data(request, *args, **kwargs)
 
-class RecipeViewSet(viewsets.ModelViewSet):
+
+class RecipeViewSet(ConditionalRecipeMixin, OptionalKeysetPaginationMixin,
+                    viewsets.ModelViewSet):
     permission_classes = (AdminOrAuthorOrReadOnly,)
     pagination_class = LimitPageNumberPagination
     filter_backends = (DjangoFilterBackend,)
     filter_class = RecipeFilter
-    queryset = Recipe.objects.all()
+    keyset_excluded_params = ('search', 'ingredients')
+
+    def get_queryset(self):
+        return Recipe.objects.for_feed()
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return ShowRecipeSerializer
         return RecipeCreateSerializer
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        user_ids = list(Purchase.objects.filter(recipe=instance).values_list(
+            'user_id', flat=True
+        ))
+        ingredient_ids = recipe_ingredient_ids(instance.pk)
+        instance.delete()
+        if user_ids:
+            refresh_shopping_lists(user_ids, ingredient_ids)
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        context.update({'request': self.request})
+        context.update({
+            'request': self.request,
+            'personal_flags': get_personal_flags(self.request),
+        })
         return context
 
     @action(
@@ -54,42 +92,111 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated], detail=True
     )
     def favorite(self, request, pk):
-        user = request.user
         model = Favorite
         if request.method == 'POST':
-            return obj_create(user, model, pk=pk, message=ERROR_FAVORITE)
+            return obj_create(request, model, pk=pk, message=ERROR_FAVORITE)
         if request.method == 'DELETE':
-            return obj_delete(user, model, pk=pk, message=UNELECTED)
+            return obj_delete(request, model, pk=pk, message=UNELECTED)
 
     @action(
         methods=['POST', 'DELETE'],
         permission_classes=[permissions.IsAuthenticated], detail=True
     )
     def shopping_cart(self, request, pk):
-        user = request.user
         model = Purchase
         if request.method == 'POST':
-            return obj_create(user, model, pk=pk, message=ERROR_ON_THE_LIST)
+            return obj_create(
+                request, model, pk=pk, message=ERROR_ON_THE_LIST
+            )
         if request.method == 'DELETE':
-            return obj_delete(user, model, pk=pk, message=NOT_ON_THE_LIST)
+            return obj_delete(
+                request, model, pk=pk, message=NOT_ON_THE_LIST
+            )
 
     @action(
         detail=False,
         methods=['GET'],
-        permission_classes=[permissions.IsAuthenticated]
+        permission_classes=[permissions.IsAuthenticated],
+        renderer_classes=SHOPPING_CART_RENDERERS,
+        content_negotiation_class=FormatNegotiation
     )
     def download_shopping_cart(self, request):
-        ingredients = IngredientInRecipe.objects.filter(
-            recipe__in_purchases__user=request.user).values(
-            'ingredient__name',
-            'ingredient__measurement_unit').annotate(total=Sum('amount'))
-
-        shopping_cart = '\n'.join([
-            f'{ingredient["ingredient__name"]} - {ingredient["total"]} '
-            f'{ingredient["ingredient__measurement_unit"]}'
-            for ingredient in ingredients
-        ])
-        filename = 'shopping_cart.txt'
-        response = HttpResponse(shopping_cart, content_type='text/plain')
-        response['Content-Disposition'] = f'attachment; filename={filename}'
-        return response
+        return export_shopping_cart(
+            request.user,
+            request.accepted_renderer.format
+        )
+
+    def get_match_params(self, request):
+        try:
+            ingredient_ids = {
+                int(value)
+                for values in request.query_params.getlist('ingredients')
+                for value in values.split(',') if value
+            }
+        except ValueError:
+            raise ValidationError({'ingredients': [INVALID_INGREDIENTS]})
+        if not ingredient_ids:
+            raise ValidationError({'ingredients': [NO_INGREDIENTS]})
+        try:
+            min_matches = int(request.query_params.get('min_matches', 1))
+        except ValueError:
+            min_matches = 0
+        if min_matches < 1:
+            raise ValidationError({'min_matches': [INVALID_MIN_MATCHES]})
+        return ingredient_ids, min_matches
+
+    def filter_matches(self, matches):
+        if not set(self.request.query_params) & set(RecipeFilter.base_filters):
+            return matches
+        queryset = self.filter_queryset(Recipe.objects.all())
+        recipe_ids = [match.recipe_id for match in matches]
+        allowed = set()
+        for start in range(0, len(recipe_ids), FILTER_CHUNK_SIZE):
+            allowed.update(queryset.filter(
+                pk__in=recipe_ids[start:start + FILTER_CHUNK_SIZE]
+            ).values_list('pk', flat=True))
+        return [match for match in matches if match.recipe_id in allowed]
+
+    @action(detail=False, methods=['GET'])
+    def cook(self, request):
+        ingredient_ids, min_matches = self.get_match_params(request)
+        matches = self.filter_matches(
+            matcher.match(ingredient_ids, min_matches)
+        )
+        page = self.paginate_queryset(matches)
+        recipes = self.get_queryset().in_bulk(
+            [match.recipe_id for match in page]
+        )
+        context = self.get_serializer_context()
+        context['matches'] = {match.recipe_id: match for match in page}
+        serializer = RecipeMatchSerializer(
+            [recipes[match.recipe_id] for match in page
+             if match.recipe_id in recipes],
+            many=True,
+            context=context
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['GET'],
+        permission_classes=[permissions.IsAuthenticated]
+    )
+    def feed(self, request):
+        paginator = TimelinePagination()
+        page = paginator.paginate_timeline(
+            self.get_watermark_queryset(), request
+        )
+        etag = self.get_etag(
+            request, paginator.get_next_link(),
+            [(recipe.pk, recipe.updated_at) for recipe in page]
+        )
+        response = self.get_not_modified(request, etag)
+        if response is not None:
+            return response
+        return self.finalize_etag(
+            paginator.get_paginated_response(
+                self.get_recipe_data(request, page)
+            ),
+            etag
+        )
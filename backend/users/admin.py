@@ -4,8 +4,12 @@ from .models import User
 
 
 class UserAdmin(admin.ModelAdmin):
-    list_display = ('id', 'email', 'username', 'first_name', 'last_name')
+    list_display = (
+        'id', 'email', 'username', 'first_name', 'last_name',
+        'recipes_count', 'followers_count',
+    )
     list_filter = ('email', 'username')
+    readonly_fields = ('recipes_count', 'followers_count')
 
 
 admin.site.register(User, UserAdmin)
@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+INDEX_NAME = 'follow_author_user_idx'
+
+
+def concurrently(schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        return 'CONCURRENTLY '
+    return ''
+
+
+def create_index(apps, schema_editor):
+    schema_editor.execute(
+        f'CREATE INDEX {concurrently(schema_editor)}IF NOT EXISTS '
+        f'{INDEX_NAME} ON users_follow (author_id, user_id)'
+    )
+
+
+def drop_index(apps, schema_editor):
+    schema_editor.execute(
+        f'DROP INDEX {concurrently(schema_editor)}IF EXISTS {INDEX_NAME}'
+    )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('users', '0003_user_counters'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_index, drop_index),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='follow',
+                    index=models.Index(fields=['author', 'user'], name='follow_author_user_idx'),
+                ),
+            ],
+        ),
+    ]
@@ -1,6 +1,134 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+INVALID_CURSOR = 'Неверный курсор'
 
 
 class LimitPageNumberPagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+
+
+class KeysetPagination(BasePagination):
+    page_size = 6
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.count = None
+        if request.query_params.get(self.count_query_param) in (
+                'true', '1'):
+            self.count = queryset.count()
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(
+                self.get_keyset_filter(queryset.model, cursor)
+            )
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        results = results[:self.page_size]
+        self.last = results[-1] if results else None
+        return results
+
+    def get_page_size(self, request):
+        try:
+            return max(
+                int(request.query_params[self.page_size_query_param]), 1
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, queryset):
+        ordering = list(
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            descending = bool(ordering) and ordering[0].startswith('-')
+            ordering.append('-id' if descending else 'id')
+        return ordering
+
+    def decode_cursor(self, model, cursor):
+        fields = [field.lstrip('-') for field in self.ordering]
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            values = [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(fields, values)
+            ]
+        except (binascii.Error, ValueError, TypeError):
+            raise NotFound(INVALID_CURSOR)
+        if len(values) != len(fields):
+            raise NotFound(INVALID_CURSOR)
+        return values
+
+    def get_keyset_filter(self, model, cursor):
+        values = self.decode_cursor(model, cursor)
+        fields = [field.lstrip('-') for field in self.ordering]
+        keyset = Q()
+        for position, field in enumerate(self.ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition = Q(
+                **{f'{fields[position]}__{lookup}': values[position]}
+            )
+            for previous in range(position):
+                condition &= Q(**{fields[previous]: values[previous]})
+            keyset |= condition
+        return keyset
+
+    def encode_cursor(self, instance):
+        values = [
+            getattr(instance, field.lstrip('-')) for field in self.ordering
+        ]
+        return base64.urlsafe_b64encode(json.dumps(
+            [value.isoformat() if hasattr(value, 'isoformat') else value
+             for value in values]
+        ).encode()).decode()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.last)
+        )
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([('next', self.get_next_link())])
+        if self.count is not None:
+            response['count'] = self.count
+        response['results'] = data
+        return Response(response)
+
+
+class OptionalKeysetPaginationMixin:
+    keyset_pagination_class = KeysetPagination
+    keyset_excluded_params = ()
+
+    def use_keyset(self):
+        params = self.request.query_params
+        return KeysetPagination.cursor_query_param in params and not any(
+            param in params for param in self.keyset_excluded_params
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.use_keyset():
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
@@ -1,5 +1,7 @@
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from recipes.fields import Base64ImageField
+from recipes.flags import personal_flags
+from recipes.images import rendition_urls
 from recipes.models import Recipe
 from rest_framework import serializers
 
@@ -29,10 +31,14 @@ class UserCreateSerializer(UserCreateSerializer):
 
 class RecipeSubcribeSerializer(serializers.ModelSerializer):
     image = Base64ImageField()
+    image_renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time',)
+        fields = ('id', 'name', 'image', 'image_renditions', 'cooking_time',)
+
+    def get_image_renditions(self, obj):
+        return rendition_urls(obj)
 
 
 class CustomUserSerializer(UserSerializer):
@@ -50,10 +56,7 @@ class CustomUserSerializer(UserSerializer):
         model = User
 
     def get_is_subscribed(self, obj):
-        user = self.context.get('request').user
-        return user.is_authenticated and Follow.objects.filter(
-            author=obj, user=user
-        ).exists()
+        return personal_flags(self.context).is_subscribed(obj)
 
 
 class FollowSerializer(serializers.ModelSerializer):
@@ -80,18 +83,18 @@ class FollowSerializer(serializers.ModelSerializer):
         )
 
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        limit = request.GET.get('recipes_limit')
-        queryset = Recipe.objects.filter(author=obj.author)
-        if limit:
-            queryset = queryset[:int(limit)]
+        if hasattr(obj.author, 'limited'):
+            queryset = obj.author.limited
+        else:
+            request = self.context.get('request')
+            limit = request.GET.get('recipes_limit')
+            queryset = Recipe.objects.filter(author=obj.author)
+            if limit:
+                queryset = queryset[:int(limit)]
         return RecipeSubcribeSerializer(queryset, many=True).data
 
     def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj.author).count()
+        return obj.author.recipes_count
 
     def get_is_subscribed(self, obj):
-        user = self.context.get('request').user
-        return user.is_authenticated and Follow.objects.filter(
-            author=obj.author, user=user
-        ).exists()
+        return True
@@ -1,11 +1,17 @@
+from django.db import transaction
+from django.db.models import OuterRef, Prefetch, Subquery
 from django.shortcuts import get_object_or_404
 from djoser.serializers import SetPasswordSerializer
+from recipes.flags import get_personal_flags
+from recipes.models import Recipe
+from recipes.timelines import schedule_backfill, schedule_rebuild
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from .models import Follow, User
-from .pagination import LimitPageNumberPagination
+from .pagination import (LimitPageNumberPagination,
+                         OptionalKeysetPaginationMixin)
 from .permissions import IsAdminOrReadOnly
 from .serializers import (CustomUserSerializer, FollowSerializer,
                           UserCreateSerializer)
@@ -15,7 +21,7 @@ ERROR_TWICE_SUBSCRIBE = 'Вы не можете подписаться повт
 MYSELF = 'Самоподписка!'
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(OptionalKeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     pagination_class = LimitPageNumberPagination
 
@@ -80,7 +86,7 @@ class UserViewSet(viewsets.ModelViewSet):
         self.request.user.set_password(
             serializer.validated_data.get('new_password')
         )
-        self.request.user.save()
+        self.request.user.save(update_fields=['password'])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -101,7 +107,10 @@ class UserViewSet(viewsets.ModelViewSet):
                     ERROR_UNSUBSCRIBE,
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            follow.delete()
+            with transaction.atomic():
+                follow.delete()
+                schedule_rebuild(user.pk)
+            get_personal_flags(request).invalidate(Follow)
             return Response(status=status.HTTP_204_NO_CONTENT)
         if Follow.objects.filter(author=author, user=user).exists():
             return Response(
@@ -110,7 +119,10 @@ class UserViewSet(viewsets.ModelViewSet):
             )
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(user=user, author=author)
+        with transaction.atomic():
+            serializer.save(user=user, author=author)
+            schedule_backfill(user.pk, author)
+        get_personal_flags(request).invalidate(Follow)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @action(
@@ -120,7 +132,19 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def subscriptions(self, request):
         user = request.user
-        queryset = Follow.objects.filter(user=user)
+        limit = request.GET.get('recipes_limit')
+        recipes = Recipe.objects.all()
+        if limit:
+            recipes = recipes.filter(pk__in=Subquery(
+                Recipe.objects.filter(
+                    author=OuterRef('author')
+                ).values('pk')[:int(limit)]
+            ))
+        queryset = Follow.objects.filter(user=user).select_related(
+            'author'
+        ).prefetch_related(
+            Prefetch('author__recipes', queryset=recipes, to_attr='limited')
+        ).order_by('id')
         pages = self.paginate_queryset(queryset)
         serializer = FollowSerializer(
             pages,